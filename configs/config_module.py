@@ -67,6 +67,7 @@ class AuthConfig(BaseModel):
     database_url: str = Field("sqlite:///./auth.db", description="URL de connexion à la base de données d'authentification.")
     host: str = Field("0.0.0.0", description="Hôte sur lequel le service d'authentification écoute.")
     port: int = Field(8005, description="Port sur lequel le service d'authentification écoute.")
+    workers: int = Field(4, description="Nombre de workers Uvicorn du service d'authentification (hors développement).")
 
 
 class OllamaConfig(BaseModel):
@@ -122,6 +123,7 @@ class RedisConfig(BaseModel):
     port: int = Field(6379, description="Port du serveur Redis.")
     db: int = Field(0, description="Numéro de la base de données Redis.")
     password: Optional[str] = Field(None, description="Mot de passe pour la connexion Redis.")
+    max_connections: int = Field(50, description="Taille maximale du pool de connexions Redis.")
     ssl: bool = Field(False, description="Utiliser SSL/TLS pour la connexion Redis.")
     encrypt_values: bool = Field(True, description="Chiffrer les valeurs stockées dans Redis.")
     ttl_sfd_analysis: int = Field(86400, description="TTL pour les résultats d'analyse SFD en secondes.")
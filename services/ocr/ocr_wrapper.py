@@ -13,6 +13,7 @@ import logging
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
@@ -156,14 +157,25 @@ async def _extract_mock(req: OCRRequest) -> Dict[str, Any]:
     return {"text": text, "confidence": 0.95, "metadata": {"mode": "mock"}}
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=5))
-async def _extract_doctoplus(req: OCRRequest) -> Dict[str, Any]:
-    """Extrait le texte en utilisant la bibliothèque Doctopus OCR (implémentation réelle)."""
+@lru_cache(maxsize=1)
+def _doctoplus_wrapper() -> Any:
+    """Retourne le moteur Doctopus du processus, créé une seule fois.
+
+    Le pré-traitement des pages (binarisation, débruitage, redressement) est
+    réalisé par le moteur lui-même ; le réutiliser évite de recharger sa
+    configuration et ses modèles à chaque document.
+    """
     from doctopus_ocr import DoctopusWrapper  # type: ignore
 
-    wrapper = DoctopusWrapper(
+    return DoctopusWrapper(
         config_path=os.getenv("DOCTOPLUS_CONFIG", "/app/config/config.json")
     )
+
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=5))
+async def _extract_doctoplus(req: OCRRequest) -> Dict[str, Any]:
+    """Extrait le texte en utilisant la bibliothèque Doctopus OCR (implémentation réelle)."""
+    wrapper = _doctoplus_wrapper()
     result = await wrapper.extract_text(
         file_path=req.file_path,
         language=req.language,
@@ -9,6 +9,7 @@ Les fichiers originaux sont ensuite supprimés.
 
 import datetime
 import logging
+import os
 import tarfile
 from pathlib import Path
 
@@ -16,6 +17,43 @@ from src.infrastructure.encryption import AltioraEncryption
 
 logger = logging.getLogger(__name__)
 
+# En dessous de ce seuil, la copie classique de `tarfile` est aussi rapide.
+_SENDFILE_MIN_SIZE = 1 << 20  # 1 MiB
+
+
+def _add_to_tar(tar: tarfile.TarFile, path: Path) -> None:
+    """Ajoute `path` à l'archive, en copiant les gros fichiers via `os.sendfile`.
+
+    L'en-tête est écrit par `TarInfo.tobuf()`, puis le contenu est copié de
+    descripteur à descripteur dans le noyau (sans passer par l'espace utilisateur).
+    Les répertoires, liens et petits fichiers passent par `tarfile.add`.
+    """
+    info = tar.gettarinfo(path, arcname=path.name)
+    if not hasattr(os, "sendfile") or not info.isreg() or info.size < _SENDFILE_MIN_SIZE:
+        tar.add(path, arcname=path.name)
+        return
+
+    header = info.tobuf(tar.format, tar.encoding, tar.errors)
+    tar.fileobj.write(header)
+    tar.fileobj.flush()
+    out_fd = tar.fileobj.fileno()
+    with open(path, "rb") as src:
+        in_fd = src.fileno()
+        offset = 0
+        while offset < info.size:
+            sent = os.sendfile(out_fd, in_fd, offset, info.size - offset)
+            if sent == 0:
+                raise OSError(f"Fin de fichier inattendue lors de l'archivage de {path}")
+            offset += sent
+
+    # Complète le dernier bloc de 512 octets, comme le fait `tarfile.addfile`.
+    blocks, remainder = divmod(info.size, tarfile.BLOCKSIZE)
+    if remainder:
+        tar.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+        blocks += 1
+    tar.offset += len(header) + blocks * tarfile.BLOCKSIZE
+    tar.members.append(info)
+
 
 def rotate_monthly():
     """Effectue la rotation mensuelle des journaux d'audit.
@@ -43,7 +81,7 @@ def rotate_monthly():
         with tarfile.open(temp_archive_path, "w") as tar:
             # Parcourt tous les fichiers de log compressés dans le répertoire d'audit.
             for log_file in audit_log_dir.glob("*.jsonl.zst"):
-                tar.add(log_file, arcname=log_file.name) # Ajoute le fichier à l'archive.
+                _add_to_tar(tar, log_file) # Ajoute le fichier à l'archive.
                 log_file.unlink() # Supprime le fichier original après l'avoir ajouté à l'archive.
         logger.info(f"Fichiers de log archivés dans {temp_archive_path}.")
 
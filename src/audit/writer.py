@@ -8,13 +8,14 @@ la fréquence des opérations d'écriture sur disque et d'améliorer les perform
 """
 
 import asyncio
+import io
+import threading
 from pathlib import Path
 import logging
 from datetime import datetime
 from src.audit.ring_buffer import RingBuffer
 from src.audit.models import AuditEvent
 
-import aiofiles
 import zstandard as zstd
 
 logger = logging.getLogger(__name__)
@@ -33,14 +34,19 @@ class AsyncAuditWriter:
         """
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True) # Crée le répertoire si nécessaire.
-        self._ctx = zstd.ZstdCompressor(level=3)  # Compresseur Zstandard (niveau 3 pour un bon équilibre).
         self._buffer = RingBuffer(size=buffer_size)
         self._flush_interval = flush_interval
         self._flush_task: asyncio.Task | None = None
+        # Compresseur Zstandard réutilisé par toutes les écritures (niveau 3, un
+        # worker par cœur). Un `ZstdCompressor` n'est pas sûr entre threads et le
+        # flush final de `stop()` peut chevaucher une écriture périodique dont le
+        # thread poursuit après l'annulation de la tâche : le verrou les sérialise.
+        self._cctx = zstd.ZstdCompressor(level=3, threads=-1)
+        self._cctx_lock = threading.Lock()
 
     async def start(self):
         """Démarre la tâche de flush périodique en arrière-plan."""
-        if self._flush_task === None or self._flush_task.done():
+        if self._flush_task is None or self._flush_task.done():
             self._flush_task = asyncio.create_task(self._periodic_flush())
             logger.info(f"AsyncAuditWriter démarré. Flush toutes les {self._flush_interval} secondes.")
 
@@ -82,13 +88,17 @@ class AsyncAuditWriter:
             # Génère un nom de fichier unique basé sur l'horodatage.
             path = self.log_dir / f"audit_{datetime.utcnow():%Y%m%d_%H%M%S_%f}.jsonl.zst"
             try:
-                async with aiofiles.open(path, "wb") as f:
-                    # Compresse le lot d'événements et l'écrit dans le fichier.
-                    await f.write(self._ctx.compress("\n".join(batch).encode('utf-8')))
+                # Compresse et écrit le lot dans un thread pour ne pas bloquer la boucle.
+                await asyncio.to_thread(self._write_compressed, path, "\n".join(batch).encode('utf-8'))
                 logger.info(f"Logs d'audit écrits sur disque : {path} ({len(batch)} événements).")
             except (IOError, OSError, zstd.ZstdError) as e:
                 logger.error(f"Erreur lors de l'écriture des logs d'audit sur {path}: {e}")
 
+    def _write_compressed(self, path: Path, data: bytes) -> None:
+        """Compresse `data` en flux directement dans le fichier `path` (appel bloquant)."""
+        with self._cctx_lock, open(path, "wb") as f:
+            self._cctx.copy_stream(io.BytesIO(data), f, size=len(data))
+
 
 # ------------------------------------------------------------------
 # Démonstration (exemple d'utilisation)
@@ -0,0 +1,123 @@
+# src/auth/_hs256.py
+"""Chemin rapide HS256 pour la création et la vérification des jetons JWT.
+
+PyJWT reconstruit et re-sérialise l'en-tête, puis passe par plusieurs couches
+d'objets (algorithmes, options, validation des claims) à chaque appel. Pour
+HS256, seul le chemin minimal est nécessaire : l'en-tête est constant et
+pré-encodé une fois, et la signature est calculée par `hmac.digest`, qui
+délègue en une seule passe à l'implémentation C d'OpenSSL.
+
+Les erreurs levées sont celles de PyJWT, afin que les appelants conservent
+leur gestion d'exceptions existante.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Dict
+
+import jwt
+
+# En-tête constant, sérialisé exactement comme PyJWT (clés triées, compact).
+_HEADER_SEGMENT = base64.urlsafe_b64encode(
+    json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":"), sort_keys=True).encode()
+).rstrip(b"=")
+_HEADER_PREFIX = _HEADER_SEGMENT + b"."
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def encode_hs256(payload: Dict[str, Any], key: bytes) -> str:
+    """Encode `payload` en JWT HS256 signé avec `key`.
+
+    Une valeur `exp` de type `datetime` est convertie en timestamp entier,
+    comme le fait PyJWT.
+    """
+    exp = payload.get("exp")
+    if isinstance(exp, datetime):
+        payload = {**payload, "exp": timegm(exp.utctimetuple())}
+    signing_input = _HEADER_PREFIX + _b64encode(_dumps(payload).encode())
+    signature = hmac.digest(key, signing_input, "sha256")
+    return (signing_input + b"." + _b64encode(signature)).decode("ascii")
+
+
+# Claims dont la validation reste confiée à PyJWT (absents des jetons émis ici).
+_DELEGATED_CLAIMS = ("aud", "jti")
+
+
+def _int_claim(payload: Dict[str, Any], name: str, error: type, message: str) -> int:
+    """Convertit un claim temporel en entier, comme PyJWT (`int()` puis erreur dédiée)."""
+    try:
+        return int(payload[name])
+    except (TypeError, ValueError):
+        raise error(message) from None
+
+
+def decode_hs256(token: str, key: bytes, leeway: int = 0) -> Dict[str, Any]:
+    """Vérifie la signature et les claims temporels d'un JWT HS256 et retourne son payload.
+
+    `iat`, `nbf` et `exp` sont contrôlés comme par `jwt.decode`. Un jeton portant
+    `aud`, `jti` ou un `sub` non textuel est confié à `jwt.decode`.
+
+    Raises:
+        jwt.ExpiredSignatureError: Si le claim `exp` est dépassé.
+        jwt.ImmatureSignatureError: Si le claim `nbf` ou `iat` est dans le futur.
+        jwt.InvalidTokenError: Si le jeton est mal formé, d'un autre algorithme
+            ou si la signature ne correspond pas.
+    """
+    raw = token.encode("ascii", "strict") if token.isascii() else b""
+    signing_input, _, signature_segment = raw.rpartition(b".")
+    header_segment, _, payload_segment = signing_input.partition(b".")
+    if header_segment != _HEADER_SEGMENT or not payload_segment:
+        # En-tête inattendu (autre alg, kid, ordre des clés) : PyJWT tranche.
+        return jwt.decode(token, key, algorithms=["HS256"], leeway=leeway)
+
+    try:
+        signature = _b64decode(signature_segment)
+        payload = json.loads(_b64decode(payload_segment))
+    except (binascii.Error, ValueError) as exc:
+        raise jwt.DecodeError("Jeton mal formé") from exc
+
+    if not hmac.compare_digest(signature, hmac.digest(key, signing_input, "sha256")):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload string: must be a json object")
+
+    delegated = any(claim in payload for claim in _DELEGATED_CLAIMS)
+    if delegated or not isinstance(payload.get("sub", ""), str):
+        return jwt.decode(token, key, algorithms=["HS256"], leeway=leeway)
+
+    now = time.time()
+    if "iat" in payload:
+        iat = _int_claim(
+            payload, "iat", jwt.InvalidIssuedAtError, "Issued At claim (iat) must be an integer."
+        )
+        if iat > now + leeway:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (iat)")
+    if "nbf" in payload:
+        nbf = _int_claim(
+            payload, "nbf", jwt.DecodeError, "Not Before claim (nbf) must be an integer."
+        )
+        if nbf > now + leeway:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    if "exp" in payload:
+        exp = _int_claim(
+            payload, "exp", jwt.DecodeError, "Expiration Time claim (exp) must be an integer."
+        )
+        if exp <= now - leeway:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    return payload
@@ -2,6 +2,7 @@
 Intégration de l'authentification avec l'orchestrateur Altiora
 """
 import asyncio
+import hmac
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 
@@ -60,6 +61,5 @@ class AuthIntegration:
         # TODO: Implémenter la logique réelle de vérification de la clé API.
         # Cela pourrait impliquer de vérifier la clé dans une base de données
         # ou un service de gestion des clés API.
-        if api_key == "your-super-secret-api-key":  # Placeholder for demonstration
-            return True
-        return False
+        # Comparaison en temps constant : la durée ne révèle pas le préfixe correct.
+        return hmac.compare_digest(api_key.encode(), b"your-super-secret-api-key")  # Placeholder for demonstration
@@ -0,0 +1,160 @@
+# src/auth/database.py
+"""Moteur et sessions SQLAlchemy asynchrones du service d'authentification.
+
+Ce module est l'unique source du moteur de base de données et de la
+dépendance `get_db`, partagée par les routes (`main.py`) et par les
+dépendances d'authentification (`middleware.py`).
+
+Les sessions sont portées par une `async_scoped_session` indexée sur la tâche
+asyncio courante : toutes les dépendances d'une requête partagent la même
+session, libérée par `ScopedSessionMiddleware` une fois la réponse émise.
+"""
+
+from __future__ import annotations
+
+from asyncio import current_task
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    event,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from configs.config_module import get_settings
+
+settings = get_settings()  # Utilise le singleton pour charger la configuration
+
+# Pilotes asynchrones substitués aux pilotes synchrones des URL configurées.
+_ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+}
+
+
+def _async_database_url(url: str) -> str:
+    """Convertit une URL SQLAlchemy synchrone en URL utilisant un pilote asynchrone."""
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+DATABASE_URL = _async_database_url(settings.auth.database_url)
+
+# Crée le moteur SQLAlchemy asynchrone : les E/S base de données ne bloquent
+# plus le pool de threads d'AnyIO. Le dimensionnement du pool ne s'applique
+# qu'aux serveurs de base de données (SQLite garde le pool par défaut du dialecte).
+_pool_options = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_recycle": 3600,
+}
+engine = create_async_engine(DATABASE_URL, **_pool_options)
+
+# Réglages SQLite appliqués à chaque connexion : journal WAL (les lectures ne
+# bloquent plus l'écriture des compteurs de connexion) et fsync allégé, sûr en WAL.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    """Applique `_SQLITE_PRAGMAS` à une nouvelle connexion SQLite."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Crée une fabrique de sessions asynchrones pour interagir avec la base de données.
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+# Une session par tâche asyncio, c'est-à-dire par requête HTTP.
+AsyncScopedSession = async_scoped_session(SessionLocal, scopefunc=current_task)
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """Met à niveau une base existante ; idempotent, exécuté au démarrage après `create_all`.
+
+    `create_all` ne modifie pas les tables déjà présentes : la colonne
+    `users.locked_until_ts` y est ajoutée ici, et les verrouillages encore
+    actifs de l'ancienne colonne `locked_until` y sont recopiés.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns("users")}
+    if "locked_until_ts" in columns:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(text("ALTER TABLE users ADD COLUMN locked_until_ts INTEGER"))
+    except DBAPIError:
+        # Plusieurs workers démarrent en même temps : un autre a pu ajouter la colonne.
+        if "locked_until_ts" not in {c["name"] for c in inspect(connection).get_columns("users")}:
+            raise
+        return
+    if "locked_until" not in columns:
+        return
+
+    legacy = Table(
+        "users", MetaData(),
+        Column("id", Integer),
+        Column("locked_until", DateTime),
+        Column("locked_until_ts", Integer),
+    )
+    active = connection.execute(
+        select(legacy.c.id, legacy.c.locked_until).where(legacy.c.locked_until > datetime.utcnow())
+    )
+    for user_id, locked_until in active.all():
+        until_ts = int(locked_until.replace(tzinfo=timezone.utc).timestamp())
+        connection.execute(
+            update(legacy).where(legacy.c.id == user_id).values(locked_until_ts=until_ts)
+        )
+
+
+async def get_db() -> AsyncSession:
+    """Dépendance FastAPI retournant la session de la requête courante."""
+    return AsyncScopedSession()
+
+
+class ScopedSessionMiddleware:
+    """Middleware ASGI qui ferme la session de la requête après la réponse.
+
+    Implémenté en ASGI pur (et non via `BaseHTTPMiddleware`) pour s'exécuter
+    dans la même tâche que le routage, dont dépend la portée de la session.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await AsyncScopedSession.remove()
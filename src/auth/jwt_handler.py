@@ -14,6 +14,7 @@ import jwt
 from fastapi import HTTPException, status
 
 from configs.config_module import get_settings
+from src.auth._hs256 import decode_hs256, encode_hs256
 from src.auth.models import TokenData
 
 # Charge la configuration spécifique à JWT depuis les paramètres globaux.
@@ -27,8 +28,11 @@ class JWTHandler:
         """Initialise le gestionnaire avec les paramètres de configuration."""
         self.secret_key = settings.jwt_secret
         self.algorithm = settings.jwt_algorithm
+        self._algorithms = [self.algorithm]  # Liste passée à `jwt.decode`, construite une fois.
         self.access_expire = timedelta(minutes=settings.access_token_expire_minutes)
         self.refresh_expire = timedelta(days=settings.refresh_token_expire_days)
+        # HS256 passe par un chemin rapide (en-tête pré-encodé, HMAC one-shot).
+        self._hs256_key = self.secret_key.encode() if self.algorithm == "HS256" else None
 
     def create_access_token(self, data: Dict[str, Any]) -> str:
         """Crée un jeton d'accès JWT.
@@ -36,28 +40,39 @@ class JWTHandler:
         Args:
             data: Le dictionnaire de données (payload) à inclure dans le jeton.
                   Doit contenir 'sub' (sujet), 'user_id', et 'roles'.
+                  Il est enrichi temporairement puis restauré (pas de copie).
 
         Returns:
             Le jeton d'accès encodé sous forme de chaîne de caractères.
         """
-        to_encode = data.copy()
-        expire = datetime.utcnow() + self.access_expire
-        to_encode.update({"exp": expire, "type": "access"})
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return self._mint(data, exp=datetime.utcnow() + self.access_expire, token_type="access")
 
     def create_refresh_token(self, data: Dict[str, Any]) -> str:
         """Crée un jeton de rafraîchissement JWT.
 
         Args:
-            data: Le payload à inclure dans le jeton.
+            data: Le payload à inclure dans le jeton (restauré après encodage).
 
         Returns:
             Le jeton de rafraîchissement encodé.
         """
-        to_encode = data.copy()
-        expire = datetime.utcnow() + self.refresh_expire
-        to_encode.update({"exp": expire, "type": "refresh"})
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return self._mint(data, exp=datetime.utcnow() + self.refresh_expire, token_type="refresh")
+
+    def _mint(self, data: Dict[str, Any], *, exp: datetime, token_type: str) -> str:
+        """Encode `data` en ajoutant `exp` et `type` sans copier le dictionnaire.
+
+        Les clés ajoutées sont retirées après l'encodage : l'appelant retrouve
+        son payload intact, sans allocation d'un dictionnaire intermédiaire.
+        """
+        data["exp"] = exp
+        data["type"] = token_type
+        try:
+            if self._hs256_key is not None:
+                return encode_hs256(data, self._hs256_key)
+            return jwt.encode(data, self.secret_key, algorithm=self.algorithm)
+        finally:
+            del data["exp"]
+            del data["type"]
 
     def verify_token(self, token: str, token_type: str = "access") -> TokenData:
         """Vérifie et décode un jeton, en s'assurant qu'il est du bon type.
@@ -73,7 +88,10 @@ class JWTHandler:
             Les données du jeton décodé sous forme d'un objet `TokenData`.
         """
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            if self._hs256_key is not None:
+                payload = decode_hs256(token, self._hs256_key)
+            else:
+                payload = jwt.decode(token, self.secret_key, algorithms=self._algorithms)
 
             # Vérifie que le type de jeton correspond à celui attendu.
             if payload.get("type") != token_type:
@@ -92,7 +110,8 @@ class JWTHandler:
             return TokenData(
                 username=username,
                 user_id=payload.get("user_id"),
-                roles=payload.get("roles", [])
+                roles=payload.get("roles", []),
+                exp=payload.get("exp"),
             )
 
         except jwt.ExpiredSignatureError:
@@ -13,67 +13,112 @@ et une limitation de débit pour se protéger contre les attaques par force brut
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Annotated
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator
 
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, status
+from anyio import to_thread
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 
-from configs.config_module import get_settings
+from configs.config_module import Environment, get_settings
+from src.auth.database import ScopedSessionMiddleware, engine, get_db, upgrade_schema
 from src.auth.jwt_handler import jwt_handler
 from src.auth.middleware import get_current_active_user
-from src.auth.models import Base, Token, UserCreate, UserResponse
-from src.auth.password_utils import is_password_strong
+from src.auth.models import Base, Token, UserCreate, UserResponse, WeakPasswordError
 from src.auth.user_service import UserService
 
-# ------------------------------------------------------------------
-# Configuration de la base de données
-# ------------------------------------------------------------------
 settings = get_settings()  # Utilise le singleton pour charger la configuration
-DATABASE_URL = settings.auth.database_url
-
-# Crée le moteur SQLAlchemy. `check_same_thread` est pour la compatibilité avec SQLite.
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
-# Crée une fabrique de sessions pour interagir avec la base de données.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Durée de vie des jetons d'accès, résolue une fois plutôt qu'à chaque connexion.
+_ACCESS_EXPIRE_SECONDS = settings.auth.access_token_expire_minutes * 60
 
-# Crée toutes les tables définies dans les modèles SQLAlchemy.
-Base.metadata.create_all(bind=engine)
+# Validateur précompilé pour convertir un `User` SQLAlchemy en `UserResponse`.
+_USER_RESPONSE_ADAPTER = TypeAdapter(UserResponse)
 
 
 # ------------------------------------------------------------------
-# Dépendance FastAPI
+# Cycle de vie
 # ------------------------------------------------------------------
-def get_db() -> Session:
-    """Dépendance FastAPI pour fournir une session de base de données par requête."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Taille du pool de threads AnyIO par défaut (40 sinon), pour les appels bloquants
+# ordinaires. Les hachages argon2 n'en dépendent pas : ils passent par leur
+# propre limiteur, borné au nombre de cœurs (voir `user_service._HASH_LIMITER`).
+THREADPOOL_TOKENS = 100
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Crée et met à niveau les tables au démarrage, libère le pool de connexions à l'arrêt."""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+    yield
+    await engine.dispose()
 
 
 # ------------------------------------------------------------------
 # Application FastAPI
 # ------------------------------------------------------------------
-# Initialise le limiteur de débit.
-limiter = Limiter(key_func=get_remote_address)
+# Initialise le limiteur de débit. Les compteurs (fenêtre glissante) sont
+# stockés dans Redis : les limites restent globales entre workers Uvicorn
+# et survivent aux redémarrages du service. Si Redis est injoignable (dev,
+# tests, panne), les limites basculent sur un stockage en mémoire du worker
+# au lieu de faire échouer les requêtes.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.redis.url,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+)
 
 app = FastAPI(
     title="Service d'Authentification Altiora",
     description="Service d'authentification et de RBAC basé sur JWT.",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # Sérialisation JSON en C (datetime, Enum natifs).
 )
 app.state.limiter = limiter
 app.add_exception_handler(429, _rate_limit_exceeded_handler)
 
 
+@app.exception_handler(RequestValidationError)
+async def weak_password_handler(request: Request, exc: RequestValidationError) -> ORJSONResponse:
+    """Répond 400 (et non 422) quand seule la politique de mot de passe échoue.
+
+    Comme avant la validation dans `UserCreate`, un corps par ailleurs valide
+    dont le mot de passe est trop faible reçoit le message de la politique.
+    Les autres erreurs de validation gardent la réponse 422 de FastAPI.
+    """
+    errors = exc.errors()
+    weak = [
+        error["ctx"]["error"] for error in errors
+        if isinstance(error.get("ctx", {}).get("error"), WeakPasswordError)
+    ]
+    if weak and len(weak) == len(errors):
+        return ORJSONResponse(status_code=400, content={"detail": str(weak[0])})
+    return await request_validation_exception_handler(request, exc)
+
+app.add_middleware(ScopedSessionMiddleware)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.security.allowed_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 # ------------------------------------------------------------------
 # Points de terminaison (Routes)
 # ------------------------------------------------------------------
@@ -81,32 +126,31 @@ app.add_exception_handler(429, _rate_limit_exceeded_handler)
 @limiter.limit("10/minute")
 async def register(
         user: UserCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
 ) -> UserResponse:
-    """Enregistre un nouvel utilisateur avec une politique de mot de passe fort."""
-    # Valide la force du mot de passe avant de continuer.
-    ok, msg = is_password_strong(user.password)
-    if not ok:
-        raise HTTPException(status_code=400, detail=msg)
+    """Enregistre un nouvel utilisateur avec une politique de mot de passe fort.
 
+    La force du mot de passe est vérifiée lors de la validation de `UserCreate` ;
+    un mot de passe faible est renvoyé en 400 par `weak_password_handler`.
+    """
     svc = UserService(db)
     try:
-        db_user = svc.create_user(**user.model_dump())
+        db_user = await svc.create_user(**user.model_dump())
     except ValueError as e:
         # Gère les erreurs d'unicité (username/email déjà pris).
         raise HTTPException(status_code=400, detail=str(e))
-    return UserResponse.model_validate(db_user)
+    return _USER_RESPONSE_ADAPTER.validate_python(db_user, from_attributes=True)
 
 
 @app.post("/login", response_model=Token)
 @limiter.limit("20/minute") # Un peu plus permissif que l'enregistrement
 async def login(
         form: Annotated[OAuth2PasswordRequestForm, Depends()],
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
 ) -> Token:
     """Authentifie un utilisateur et retourne un jeton d'accès."""
     svc = UserService(db)
-    user = svc.authenticate_user(form.username, form.password)
+    user = await svc.authenticate_user(form.username, form.password)
 
     if not user:
         raise HTTPException(
@@ -128,7 +172,7 @@ async def login(
     access_token = jwt_handler.create_access_token(payload)
     return Token(
         access_token=access_token,
-        expires_in=settings.auth.access_token_expire_minutes * 60,
+        expires_in=_ACCESS_EXPIRE_SECONDS,
     )
 
 
@@ -138,20 +182,20 @@ async def read_users_me(
         current_user: UserResponse = Depends(get_current_active_user),
 ) -> UserResponse:
     """Retourne les informations de l'utilisateur actuellement authentifié."""
-    return current_user
+    return _USER_RESPONSE_ADAPTER.validate_python(current_user, from_attributes=True)
 
 
 @app.post("/refresh", response_model=Token)
 @limiter.limit("10/minute")
 async def refresh_access_token(
         refresh_token_str: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
 ) -> Token:
     """Émet un nouveau jeton d'accès à partir d'un jeton de rafraîchissement valide."""
     token_data = jwt_handler.verify_token(refresh_token_str, token_type="refresh")
 
     svc = UserService(db)
-    user = svc.get_user_by_username(token_data.username)
+    user = await svc.get_user_by_username(token_data.username)
     if not user:
         raise HTTPException(status_code=401, detail="Jeton de rafraîchissement invalide")
 
@@ -163,7 +207,7 @@ async def refresh_access_token(
     access_token = jwt_handler.create_access_token(new_payload)
     return Token(
         access_token=access_token,
-        expires_in=settings.auth.access_token_expire_minutes * 60,
+        expires_in=_ACCESS_EXPIRE_SECONDS,
     )
 
 
@@ -180,21 +224,40 @@ async def logout(
     return {"message": "Déconnexion réussie. Veuillez supprimer le jeton côté client."}
 
 
+_health_second = -1
+_health_timestamp = ""
+
+
+def _health_timestamp_now() -> str:
+    """Retourne l'horodatage UTC ISO 8601, recalculé au plus une fois par seconde."""
+    global _health_second, _health_timestamp
+    now = int(time.time())
+    if now != _health_second:
+        _health_second = now
+        _health_timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+    return _health_timestamp
+
+
 @app.get("/health")
-@limiter.limit("60/minute")
+@limiter.exempt  # Sondes de liveness/readiness : pas de comptage dans Redis.
 async def health_check() -> dict[str, str]:
     """Point de terminaison pour la vérification de l'état de santé du service."""
-    return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
+    return {"status": "healthy", "timestamp": _health_timestamp_now()}
 
 
 # ------------------------------------------------------------------
 # Point d'entrée pour Uvicorn
 # ------------------------------------------------------------------
 if __name__ == "__main__":
+    # Le rechargement automatique (surveillance des fichiers) est réservé au développement.
+    dev_mode = settings.environment == Environment.DEVELOPMENT
     uvicorn.run(
         "src.auth.main:app",
         host=settings.auth.host,
         port=settings.auth.port,
         log_level="info",
-        reload=True # Active le rechargement automatique pour le développement
+        loop="auto",  # uvloop (libuv) s'il est installé, asyncio sinon (Windows).
+        http="httptools",  # Parseur HTTP en C à la place de h11.
+        reload=dev_mode,
+        workers=None if dev_mode else settings.auth.workers,
     )
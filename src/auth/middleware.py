@@ -6,98 +6,112 @@ FastAPI authentication & RBAC middleware layer.
 
 from __future__ import annotations
 
-from typing import Callable
+import hashlib
+import time
+from typing import Callable, Dict, Tuple
 
-from fastapi import Depends, HTTPException, status
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .database import get_db
 from .jwt_handler import jwt_handler
-from .models import TokenData, User, UserRole  # ✅ imported User
-from .user_service import UserService
-
-limiter = Limiter(key_func=get_remote_address)
-app = FastAPI()
-app.state.limiter = limiter
-app.add_exception_handler(429, _rate_limit_exceeded_handler)
-
-# Ajout de CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Adjust as needed
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+from .models import TokenData, UserRole
+from .user_service import UserProfile, UserService
 
 
 # ------------------------------------------------------------------
-# Dependency stubs (replace with real DB session)
+# Security scheme
 # ------------------------------------------------------------------
-def get_db() -> Session:
-    """
-    Placeholder for FastAPI dependency injection.
-    Replace it with your real DB session generator.
-    """
-    # TODO: Return actual session from dependency_overrides
-    raise NotImplementedError("Override get_db() in app startup")
+security = HTTPBearer()
 
 
 # ------------------------------------------------------------------
-# Security scheme
+# Verified-token cache
 # ------------------------------------------------------------------
-security = HTTPBearer()
+# Keyed by SHA-256 of the token (the raw token is never stored). Each entry holds
+# the verified claims and the user's profile snapshot, so a hit skips both the
+# signature verification and the user lookup, for at most TOKEN_CACHE_TTL
+# seconds and never past the token's own `exp`. The active/lock checks still
+# run on every hit, and a snapshot invalidated by a write on this worker
+# (deactivation, failed logins) sends the request back to the full path.
+TOKEN_CACHE_TTL = 30
+_token_cache: TTLCache[bytes, Tuple[TokenData, UserProfile]] = TTLCache(
+    maxsize=10_000, ttl=TOKEN_CACHE_TTL
+)
 
 
 # ------------------------------------------------------------------
 # Current-user helpers
 # ------------------------------------------------------------------
 async def get_current_user(
+        request: Request,
         credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
 ) -> TokenData:
     """
     Decode JWT and return TokenData.
 
+    The UserProfile loaded for validation is stashed on ``request.state.user`` so
+    that ``get_current_active_user`` does not query it a second time.
+
     Raises
     ------
     HTTPException(401 | 423)
         If token invalid, user not found, inactive or locked.
     """
     token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        token_data, user = cached
+        fresh = token_data.exp is None or token_data.exp > time.time()
+        if fresh and UserService.is_profile_current(user):
+            _check_user_can_authenticate(user)
+            request.state.user = user
+            return token_data
+        _token_cache.pop(cache_key, None)
+
     token_data = jwt_handler.verify_token(token)
 
-    service = UserService(db)
-    user = service.get_user_by_username(token_data.username)
+    user = await UserService(db).get_user_by_username(token_data.username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    _check_user_can_authenticate(user)
+
+    request.state.user = user
+    _token_cache[cache_key] = (token_data, user)
+    return token_data
+
+
+def _check_user_can_authenticate(user: UserProfile) -> None:
+    """Raise 401/423 if the account is deactivated or locked."""
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User account is deactivated",
         )
-    if service.is_user_locked(user):
+    if UserService.is_user_locked(user):
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail="Account is locked due to failed login attempts",
         )
 
-    return token_data
-
 
 async def get_current_active_user(
+        request: Request,
         token: TokenData = Depends(get_current_user),
-        db: Session = Depends(get_db),
-) -> User:
-    """Return the full User object."""
-    return UserService(db).get_user_by_username(token.username)
+        db: AsyncSession = Depends(get_db),
+) -> UserProfile:
+    """Return the user's profile snapshot (set by ``get_current_user``, cache hits included)."""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    return await UserService(db).get_user_by_username(token.username)
 
 
 # ------------------------------------------------------------------
@@ -107,26 +121,38 @@ def require_role(required_role: UserRole) -> Callable[..., TokenData]:
     """
     Factory returning a FastAPI dependency that enforces a role.
 
+    Guards are built once per role and reused; each check is a single
+    frozenset lookup against the role's precomputed string value.
+
     Usage
     -----
     @router.get("/admin")
     def admin_dashboard(current: TokenData = Depends(require_role(UserRole.ADMIN))):
         ...
     """
+    guard = _role_guards.get(required_role)
+    if guard is not None:
+        return guard
+
+    required = required_role.value
 
-    def _guard(
+    async def _guard(
             current: TokenData = Depends(get_current_user),
     ) -> TokenData:
-        if required_role not in current.roles:
+        if required not in current.roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions",
             )
         return current
 
+    _role_guards[required_role] = _guard
     return _guard
 
 
+_role_guards: Dict[UserRole, Callable[..., TokenData]] = {}
+
+
 # Convenience shortcuts
 require_admin = require_role(UserRole.ADMIN)
 require_user = require_role(UserRole.USER)
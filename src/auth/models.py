@@ -1,10 +1,12 @@
 from pydantic import BaseModel, Field, EmailStr, field_validator
-from typing import Optional, List
+from typing import FrozenSet, Optional
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, func
 from sqlalchemy.ext.declarative import declarative_base
 
+from .password_utils import is_password_strong
+
 # Base déclarative pour les modèles SQLAlchemy.
 Base = declarative_base()
 
@@ -47,14 +49,25 @@ class User(Base):
     role = Column(String(20), default=UserRole.USER.value, nullable=False) # Stocke la valeur de l'Enum
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Horodatages calculés par la base : aucun objet `datetime` alloué côté Python à l'écriture.
+    # `default=func.now()` place `now()` dans l'INSERT lui-même, ce qui fonctionne aussi
+    # sur les tables créées avant l'ajout de `server_default`.
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     last_login = Column(DateTime, nullable=True)
     failed_login_attempts = Column(Integer, default=0)
-    locked_until = Column(DateTime, nullable=True)
+    locked_until_ts = Column(Integer, nullable=True)  # Fin du verrouillage (timestamp Unix, secondes)
     preferences = Column(Text, nullable=True)  # Stocke les préférences utilisateur au format JSON string
 
 
+class WeakPasswordError(ValueError):
+    """Le mot de passe ne respecte pas la politique de `is_password_strong`.
+
+    Levée par la validation de `UserCreate` ; le service la convertit en
+    réponse HTTP 400 portant le message de la politique.
+    """
+
+
 class UserCreate(BaseModel):
     """Modèle Pydantic pour la création d'un nouvel utilisateur."""
     username: str = Field(..., min_length=3, max_length=50, description="Nom d'utilisateur unique.")
@@ -63,6 +76,15 @@ class UserCreate(BaseModel):
     full_name: Optional[str] = Field(None, max_length=100, description="Nom complet de l'utilisateur.")
     role: UserRole = Field(UserRole.USER, description="Rôle de l'utilisateur dans le système.")
 
+    @field_validator('password')
+    @classmethod
+    def validate_password_strength(cls, v: str) -> str:
+        """Applique la politique de mot de passe fort pendant la validation du modèle."""
+        ok, msg = is_password_strong(v)
+        if not ok:
+            raise WeakPasswordError(msg)
+        return v
+
 
 class UserLogin(BaseModel):
     """Modèle Pydantic pour les informations de connexion d'un utilisateur."""
@@ -100,4 +122,5 @@ class TokenData(BaseModel):
     """Modèle Pydantic pour les données contenues dans un jeton JWT décodé."""
     username: Optional[str] = Field(None, description="Nom d'utilisateur (sujet du jeton).")
     user_id: Optional[int] = Field(None, description="ID de l'utilisateur.")
-    roles: List[str] = Field([], description="Liste des rôles de l'utilisateur.")
\ No newline at end of file
+    roles: FrozenSet[str] = Field(frozenset(), description="Ensemble des rôles de l'utilisateur.")
+    exp: Optional[int] = Field(None, description="Expiration du jeton (timestamp Unix).")
\ No newline at end of file
@@ -1,18 +1,51 @@
 from passlib.context import CryptContext
 import secrets
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 # Configuration du contexte de hachage pour les mots de passe.
-# Utilise bcrypt, un algorithme de hachage robuste et recommandé pour les mots de passe.
-# `rounds` définit le coût de calcul, plus il est élevé, plus le hachage est lent et sécurisé.
+# Utilise argon2id (paramètres OWASP : 19 Mio, 2 passes, 1 voie), plus rapide à
+# vérifier que bcrypt à 12 rounds pour une résistance équivalente.
+# bcrypt reste accepté en tant que schéma déprécié : les anciens hachages sont
+# toujours vérifiés, puis remplacés par un hachage argon2 à la connexion suivante.
 pwd_context = CryptContext(
-    schemes=["bcrypt"],
+    schemes=["argon2", "bcrypt"],
     deprecated="auto",
+    argon2__time_cost=2,  # Nombre de passes sur la mémoire.
+    argon2__memory_cost=19456,  # Mémoire utilisée en Kio.
+    argon2__parallelism=1,  # Nombre de voies (threads) par hachage.
     bcrypt__rounds=12  # Nombre de rounds (coût CPU) pour bcrypt.
 )
 
 
+# Classes de caractères exigées par `is_password_strong`. La table ci-dessous ne
+# couvre que l'ASCII ; les lettres et chiffres non ASCII (é, À…) sont classés par
+# les prédicats `str`, comme auparavant.
+_SPECIAL_CHARS = "!@#$%^&*(),.?\":{}<>"
+_UPPER, _LOWER, _DIGIT, _SPECIAL = 1, 2, 4, 8
+_ALL_CLASSES = frozenset((_UPPER, _LOWER, _DIGIT, _SPECIAL))
+
+# Table de traduction octet -> classe, construite une seule fois à l'import.
+_table = bytearray(256)
+for _chars, _bit in (
+        (b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", _UPPER),
+        (b"abcdefghijklmnopqrstuvwxyz", _LOWER),
+        (b"0123456789", _DIGIT),
+        (_SPECIAL_CHARS.encode(), _SPECIAL),
+):
+    for _byte in _chars:
+        _table[_byte] = _bit
+_CLASS_TABLE = bytes(_table)
+
+# Messages d'erreur, dans l'ordre où les classes manquantes sont signalées.
+_CLASS_ERRORS = (
+    (_UPPER, "Le mot de passe doit contenir au moins une lettre majuscule."),
+    (_LOWER, "Le mot de passe doit contenir au moins une lettre minuscule."),
+    (_DIGIT, "Le mot de passe doit contenir au moins un chiffre."),
+    (_SPECIAL, f"Le mot de passe doit contenir au moins un caractère spécial ({_SPECIAL_CHARS})."),
+)
+
+
 def hash_password(password: str) -> str:
     """Hache un mot de passe en texte clair en utilisant l'algorithme configuré.
 
@@ -34,10 +67,42 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     Returns:
         True si les mots de passe correspondent, False sinon.
-    ""
+    """
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Vérifie un mot de passe et calcule un nouveau hachage si le schéma est déprécié.
+
+    Args:
+        plain_password: Le mot de passe en texte clair fourni par l'utilisateur.
+        hashed_password: Le mot de passe haché stocké.
+
+    Returns:
+        Un tuple (bool, str | None) : le résultat de la vérification et, si le
+        hachage stocké doit être mis à jour (ex: bcrypt -> argon2), le nouveau hachage.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# Hachage de référence vérifié lorsque l'utilisateur n'existe pas, pour que la
+# réponse coûte autant qu'une vraie vérification (pas de fuite par le temps).
+_DUMMY_HASH = pwd_context.hash(secrets.token_urlsafe(16))
+
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """Effectue une vérification factice au coût d'une vérification réelle.
+
+    À appeler lorsque le nom d'utilisateur est inconnu : le temps de réponse ne
+    permet alors plus de distinguer un compte existant d'un compte inexistant.
+
+    Returns:
+        Toujours False.
+    """
+    pwd_context.verify(plain_password, _DUMMY_HASH)
+    return False
+
+
 def generate_secure_token(length: int = 32) -> str:
     """Génère un jeton sécurisé et difficile à deviner.
 
@@ -67,16 +132,21 @@ def is_password_strong(password: str) -> Tuple[bool, str]:
     if len(password) < 8:
         return False, "Le mot de passe doit contenir au moins 8 caractères."
 
-    if not any(c.isupper() for c in password):
-        return False, "Le mot de passe doit contenir au moins une lettre majuscule."
-
-    if not any(c.islower() for c in password):
-        return False, "Le mot de passe doit contenir au moins une lettre minuscule."
-
-    if not any(c.isdigit() for c in password):
-        return False, "Le mot de passe doit contenir au moins un chiffre."
-
-    if not any(c in "!@#$%^&*(),.?\":{}<>" for c in password):
-        return False, "Le mot de passe doit contenir au moins un caractère spécial (!@#$%^&*(),.?\":{}<>)."
-
+    # `bytes.translate` remplace chaque octet par sa classe en C, sans appel
+    # de méthode Python par caractère ; l'ensemble obtenu liste les classes présentes.
+    present = set(password.encode("utf-8").translate(_CLASS_TABLE))
+    if not _ALL_CLASSES <= present and not password.isascii():
+        for c in password:
+            if c.isupper():
+                present.add(_UPPER)
+            elif c.islower():
+                present.add(_LOWER)
+            elif c.isdigit():
+                present.add(_DIGIT)
+
+    if _ALL_CLASSES <= present:
+        return True, "Le mot de passe est fort."
+    for bit, message in _CLASS_ERRORS:
+        if bit not in present:
+            return False, message
     return True, "Le mot de passe est fort."
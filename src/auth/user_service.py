@@ -1,10 +1,73 @@
-from datetime import datetime, timedelta
-from typing import Optional, List
-
-from sqlalchemy.orm import Session
+import os
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from anyio import CapacityLimiter, to_thread
+from cachetools import TTLCache
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .models import User, UserRole
-from .password_utils import hash_password, verify_password
+from .password_utils import hash_password, verify_and_update_password, verify_dummy_password
+
+
+@dataclass(slots=True, frozen=True)
+class UserProfile:
+    """Instantané immuable du profil d'un utilisateur.
+
+    Porte les champs de `UserResponse` et `locked_until_ts`. Contrairement à une
+    instance `User`, il n'est attaché à aucune session : il peut être partagé
+    entre requêtes sans chargement paresseux ni état en attente.
+    """
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+    is_verified: bool
+    created_at: datetime
+    last_login: Optional[datetime]
+    locked_until_ts: Optional[int]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserProfile":
+        """Copie les colonnes de profil d'une instance `User` chargée."""
+        return cls(*(getattr(user, name) for name in _PROFILE_FIELDS))
+
+
+_PROFILE_FIELDS = tuple(field.name for field in fields(UserProfile))
+
+# Cache des profils par nom d'utilisateur, partagé entre les requêtes du worker.
+# Il ne contient que des `UserProfile` immuables, jamais d'instances ORM. Les
+# écritures de ce worker l'invalident ; celles d'un autre worker sont visibles
+# au plus tard après `USER_CACHE_TTL` secondes.
+USER_CACHE_TTL = 60
+
+# Durée de verrouillage d'un compte après 5 échecs de connexion consécutifs.
+LOCKOUT_SECONDS = 30 * 60
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=USER_CACHE_TTL)
+
+# Hachages argon2 simultanés : un par cœur. Chacun réserve ~19 Mio et sature un
+# cœur ; au-delà, les requêtes attendent au lieu de multiplier la mémoire
+# (un flot de /register ou /login ne peut plus épuiser la RAM du worker).
+_HASH_LIMITER = CapacityLimiter(os.cpu_count() or 1)
+
+# Chargements partiels : seules les colonnes utiles sont lues, ce qui évite de
+# transférer `hashed_password` et `preferences` (Text) sur le chemin des requêtes.
+# Colonnes nécessaires à la vérification du mot de passe et du verrouillage.
+_AUTH_COLUMNS = load_only(
+    User.id, User.username, User.hashed_password, User.is_active, User.locked_until_ts, User.role,
+)
+# Colonnes de `UserProfile` : celles de `UserResponse`, plus `locked_until_ts`.
+_PROFILE_COLUMNS = load_only(*(getattr(User, name) for name in _PROFILE_FIELDS))
+# Colonnes des listings d'administration.
+_LISTING_COLUMNS = load_only(User.id, User.username, User.email, User.role, User.is_active)
 
 
 class UserService:
@@ -15,11 +78,15 @@ class UserService:
     Elle interagit avec les modèles SQLAlchemy et les utilitaires de mot de passe.
     """
 
-    def __init__(self, db: Session):
-        """Initialise le service utilisateur avec une session de base de données."""
+    def __init__(self, db: AsyncSession):
+        """Initialise le service utilisateur avec une session de base de données asynchrone."""
         self.db = db
+        # Mémo des lectures de la requête courante, clé `(champ, valeur)`. Il est
+        # rangé dans `db.info` : la session étant propre à la requête, toutes les
+        # instances de `UserService` de cette requête le partagent.
+        self._req_cache: Dict[Tuple[str, Any], Union[User, UserProfile]] = db.info.setdefault("user_lookup_cache", {})
 
-    def create_user(self, username: str, email: str, password: str,
+    async def create_user(self, username: str, email: str, password: str,
                     full_name: Optional[str] = None,
                     role: UserRole = UserRole.USER) -> User:
         """Crée un nouvel utilisateur dans la base de données.
@@ -37,13 +104,23 @@ class UserService:
         Raises:
             ValueError: Si le nom d'utilisateur ou l'email existe déjà.
         """
-        # Vérifie l'unicité du nom d'utilisateur et de l'email.
-        if self.get_user_by_username(username):
-            raise ValueError("Le nom d'utilisateur existe déjà.")
-        if self.get_user_by_email(email):
+        # Vérifie l'unicité du nom d'utilisateur et de l'email en une seule requête
+        # (les deux colonnes ont un index unique). Ce n'est qu'un raccourci :
+        # les contraintes d'unicité restent la garantie face aux insertions concurrentes.
+        result = await self.db.execute(
+            select(User.username, User.email)
+            .where(or_(User.username == username, User.email == email))
+            .limit(1)
+        )
+        existing = result.first()
+        if existing is not None:
+            if existing.username == username:
+                raise ValueError("Le nom d'utilisateur existe déjà.")
             raise ValueError("L'adresse email existe déjà.")
 
-        hashed_password = hash_password(password)
+        # argon2 est coûteux en CPU et en mémoire : il s'exécute hors de la boucle
+        # d'événements, sous le limiteur dédié aux hachages.
+        hashed_password = await to_thread.run_sync(hash_password, password, limiter=_HASH_LIMITER)
 
         user = User(
             username=username,
@@ -54,11 +131,15 @@ class UserService:
         )
 
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Le nom d'utilisateur ou l'adresse email existe déjà.")
+        await self.db.refresh(user)
         return user
 
-    def authenticate_user(self, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authentifie un utilisateur en vérifiant le nom d'utilisateur et le mot de passe.
 
         Gère également les tentatives de connexion échouées et le verrouillage du compte.
@@ -70,39 +151,114 @@ class UserService:
         Returns:
             L'objet `User` si l'authentification réussit, None sinon.
         """
-        user = self.get_user_by_username(username)
+        # Lecture fraîche (hors cache) : les compteurs d'échec doivent être à jour.
+        user = await self.get_user_auth_snapshot(username)
         if not user:
+            # Même coût CPU qu'un utilisateur existant : ni énumération par le
+            # temps de réponse, ni sondage gratuit des noms d'utilisateur.
+            await to_thread.run_sync(verify_dummy_password, password, limiter=_HASH_LIMITER)
             return None
+        self._forget(username)
 
         # Vérifie le mot de passe.
-        if not verify_password(password, user.hashed_password):
-            # Incrémente le compteur d'échecs et verrouille le compte si trop de tentatives.
-            user.failed_login_attempts += 1
-            if user.failed_login_attempts >= 5:
-                user.locked_until = datetime.utcnow() + timedelta(minutes=30) # Verrouille pour 30 minutes
-            self.db.commit()
+        verified, new_hash = await to_thread.run_sync(
+            verify_and_update_password, password, user.hashed_password, limiter=_HASH_LIMITER
+        )
+        if not verified:
+            # Incrémente le compteur d'échecs et verrouille le compte si trop de tentatives,
+            # en un seul UPDATE évalué côté base (pas de flush ORM).
+            attempts = User.failed_login_attempts + 1
+            await self._update_user_row(
+                user.id,
+                failed_login_attempts=attempts,
+                locked_until_ts=case(
+                    (attempts >= 5, int(time.time()) + LOCKOUT_SECONDS),
+                    else_=User.locked_until_ts,
+                ),
+            )
             return None
 
         # Réinitialise les tentatives d'échec et met à jour la dernière connexion en cas de succès.
-        user.failed_login_attempts = 0
-        user.last_login = datetime.utcnow()
-        self.db.commit()
-
+        now = datetime.utcnow()
+        values = {"failed_login_attempts": 0, "last_login": now}
+        # Remplace un hachage d'un schéma déprécié (bcrypt) par un hachage argon2.
+        if new_hash is not None:
+            values["hashed_password"] = new_hash
+        await self._update_user_row(user.id, **values)
+
+        # Reflète les valeurs écrites sur l'instance retournée à l'appelant.
+        for key, value in values.items():
+            set_committed_value(user, key, value)
         return user
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
-        """Récupère un utilisateur par son nom d'utilisateur."""
-        return self.db.query(User).filter(User.username == username).first()
+    async def _update_user_row(self, user_id: int, **values) -> None:
+        """Met à jour une ligne `users` par un UPDATE direct, puis valide la transaction."""
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def get_user_by_username(self, username: str) -> Optional[UserProfile]:
+        """Récupère le profil d'un utilisateur par son nom d'utilisateur (avec cache TTL).
+
+        Seules les colonnes de `UserProfile` sont chargées : ni le hachage du mot
+        de passe ni les préférences ne sont lus. Le résultat est un instantané en
+        lecture seule ; utiliser `get_user_by_id` pour modifier l'utilisateur.
+        """
+        memo = self._req_cache.get(("username", username))
+        if memo is not None:
+            return memo
+
+        profile = _user_cache.get(username)
+        if profile is None:
+            user = await self._fetch_by_username(username, _PROFILE_COLUMNS)
+            if user is None:
+                return None
+            profile = _user_cache[username] = UserProfile.from_user(user)
+        self._req_cache[("username", username)] = profile
+        return profile
+
+    async def get_user_auth_snapshot(self, username: str) -> Optional[User]:
+        """Charge uniquement les colonnes nécessaires à l'authentification (hors cache)."""
+        return await self._fetch_by_username(username, _AUTH_COLUMNS)
+
+    async def _fetch_by_username(self, username: str, columns) -> Optional[User]:
+        """Exécute la requête par nom d'utilisateur (index unique sur `username`)."""
+        result = await self.db.execute(
+            select(User).options(columns).where(User.username == username)
+        )
+        return result.scalar_one_or_none()
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """Récupère un utilisateur par son adresse email."""
-        return self.db.query(User).filter(User.email == email).first()
+        memo = self._req_cache.get(("email", email))
+        if memo is not None:
+            return memo
+        result = await self.db.execute(select(User).where(User.email == email))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            self._req_cache[("email", email)] = user
+        return user
 
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Récupère un utilisateur par son ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        memo = self._req_cache.get(("id", user_id))
+        if memo is not None:
+            return memo
+        user = await self.db.get(User, user_id)
+        if user is not None:
+            self._req_cache[("id", user_id)] = user
+        return user
 
-    def update_user(self, user_id: int, **kwargs) -> Optional[User]:
+    def _forget(self, username: str) -> None:
+        """Invalide les caches (requête et processus) avant une écriture sur un utilisateur."""
+        self._req_cache.clear()
+        _user_cache.pop(username, None)
+
+    async def update_user(self, user_id: int, **kwargs) -> Optional[User]:
         """Met à jour les informations d'un utilisateur.
 
         Args:
@@ -112,21 +268,21 @@ class UserService:
         Returns:
             L'objet `User` mis à jour, ou None si l'utilisateur n'existe pas.
         """
-        user = self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(user_id)
         if not user:
             return None
 
+        self._forget(user.username)
         for key, value in kwargs.items():
             # Empêche la mise à jour directe du mot de passe via cette méthode.
             if key != "password":
                 setattr(user, key, value)
 
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def change_password(self, user_id: int, new_password: str) -> bool:
+    async def change_password(self, user_id: int, new_password: str) -> bool:
         """Change le mot de passe d'un utilisateur.
 
         Args:
@@ -136,16 +292,18 @@ class UserService:
         Returns:
             True si le mot de passe a été changé avec succès, False sinon.
         """
-        user = self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(user_id)
         if not user:
             return False
 
-        user.hashed_password = hash_password(new_password)
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
+        self._forget(user.username)
+        user.hashed_password = await to_thread.run_sync(
+            hash_password, new_password, limiter=_HASH_LIMITER
+        )
+        await self.db.commit()
         return True
 
-    def list_users(self, skip: int = 0, limit: int = 100) -> List[User]:
+    async def list_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Liste les utilisateurs avec pagination.
 
         Args:
@@ -153,11 +311,29 @@ class UserService:
             limit: Nombre maximal d'utilisateurs à retourner.
 
         Returns:
-            Une liste d'objets `User`.
+            Une liste d'objets `User` (colonnes de listing uniquement).
         """
-        return self.db.query(User).offset(skip).limit(limit).all()
+        result = await self.db.execute(
+            select(User).options(_LISTING_COLUMNS).order_by(User.id).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def iter_users(self, batch_size: int = 500) -> AsyncIterator[User]:
+        """Parcourt tous les utilisateurs en flux, par lots de `batch_size` lignes.
 
-    def deactivate_user(self, user_id: int) -> bool:
+        Destiné aux exports volumineux : les lignes sont lues au fil de l'eau
+        (curseur serveur) au lieu d'être toutes matérialisées en mémoire.
+        """
+        result = await self.db.stream(
+            select(User)
+            .options(_LISTING_COLUMNS)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for user in result.scalars():
+            yield user
+
+    async def deactivate_user(self, user_id: int) -> bool:
         """Désactive un utilisateur (le rend inactif).
 
         Args:
@@ -166,24 +342,32 @@ class UserService:
         Returns:
             True si l'utilisateur a été désactivé, False sinon.
         """
-        user = self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(user_id)
         if not user:
             return False
 
+        self._forget(user.username)
         user.is_active = False
-        self.db.commit()
+        await self.db.commit()
         return True
 
     @staticmethod
-    def is_user_locked(user: User) -> bool:
+    def is_profile_current(profile: UserProfile) -> bool:
+        """Indique si `profile` est toujours l'entrée du cache des profils.
+
+        Faux dès qu'une écriture de ce worker a invalidé l'utilisateur (ou que
+        l'entrée a expiré) : l'instantané doit alors être relu.
+        """
+        return _user_cache.get(profile.username) is profile
+
+    @staticmethod
+    def is_user_locked(user: Union[User, UserProfile]) -> bool:
         """Vérifie si un compte utilisateur est actuellement verrouillé.
 
         Args:
-            user: L'objet `User` à vérifier.
+            user: L'objet `User` ou `UserProfile` à vérifier.
 
         Returns:
             True si le compte est verrouillé, False sinon.
         """
-        if user.locked_until and user.locked_until > datetime.utcnow():
-            return True
-        return False
\ No newline at end of file
+        return bool(user.locked_until_ts and user.locked_until_ts > time.time())
\ No newline at end of file
@@ -8,13 +8,17 @@ des jobs et Prometheus pour l'exposition des métriques.
 """
 
 import asyncio
-import json
 import gc
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List, Set, Dict, Any, Optional
+from typing import List, Set, Dict, Any, Optional, Tuple
 
 import aiofiles
+import orjson
 import redis.asyncio as redis
 import zstandard as zstd
 from dependency_injector.wiring import inject, Provide
@@ -25,20 +29,94 @@ from src.core.model_pool import ModelPool
 from src.models.sfd_models import SFDAnalysisRequest
 from services.ocr.ocr_wrapper import OCRRequest, extract_text # Assurez-vous que extract_text est bien importable.
 
+logger = logging.getLogger(__name__)
+
 # --- Métriques Prometheus --- #
 BATCH_DOCS_TOTAL = Gauge("altiora_batch_docs_total", "Nombre total de documents traités par lot.")
 BATCH_SUCCESS_TOTAL = Counter("altiora_batch_success_total", "Nombre de documents traités avec succès par lot.")
 BATCH_CHUNK_TIME = Gauge("altiora_batch_chunk_seconds", "Durée de traitement d'un chunk (OCR + LLM) en secondes.")
 
+
+def _write_concurrency(default: int = 64) -> int:
+    """Plafond d'écritures simultanées : un quart de la limite de descripteurs du processus."""
+    try:
+        open_max = os.sysconf("SC_OPEN_MAX")
+    except (AttributeError, ValueError, OSError): # Windows ou limite inconnue.
+        return default
+    return max(1, min(default, open_max // 4)) if open_max > 0 else default
+
+
 # --- Configuration des ressources --- #
 MAX_WORKERS = 20        # Nombre maximal de workers pour les tâches CPU (ex: OCR).
 LLM_CONCURRENCY = 6     # Nombre maximal d'appels LLM concurrents (limité par les ressources GPU/CPU).
 CHUNK_SIZE = 16         # Nombre de SFD traitées par chunk (pour le traitement par lots).
+JOB_STATE_TTL = 3600    # Durée de conservation de l'état d'un lot dans Redis (secondes).
+WRITE_CONCURRENCY = _write_concurrency()  # Nombre maximal d'écritures de résultats simultanées (évite EMFILE).
+SMALL_DOC_BYTES = 512 * 1024  # En dessous, les documents sont OCRisés par chunks dans un même worker.
+_ACCEPTED_SUFFIXES = frozenset({".pdf", ".txt", ".docx"}) # Extensions des SFD acceptées.
+
+# Dictionnaire zstd « contenu brut » : un job sérialisé typique. Les petits blobs
+# JSON des jobs (clés et statuts identiques d'un job à l'autre) se compressent
+# alors par références à ce contenu au lieu d'être encodés à partir de rien.
+_JOB_ZSTD_DICT = zstd.ZstdCompressionDict(
+    orjson.dumps(
+        [
+            {"path": "/data/sfd/document.pdf", "ocr_text": "", "status": status, "error": "", "result": None}
+            for status in ("pending", "ocr_ok", "ocr_failed", "llm_failed", "done")
+        ]
+    ),
+    dict_type=zstd.DICT_TYPE_RAWCONTENT,
+)
+
+# ------------------------------------------------------------------
+# Workers OCR (exécutés dans des processus séparés)
+# ------------------------------------------------------------------
+def _warm_ocr_worker() -> None:
+    """Initialise un processus du pool OCR.
+
+    Charge le moteur OCR une seule fois par worker, et non à chaque document.
+    """
+    from services.ocr import ocr_wrapper
+    if ocr_wrapper._doctoplus_available():
+        ocr_wrapper._doctoplus_wrapper()
+
+
+def _ocr_in_worker(req: OCRRequest) -> str:
+    """Extrait le texte d'un document dans un processus du pool (fonction picklable)."""
+    return asyncio.run(extract_text(req)).text
+
+
+def _ocr_chunk_in_worker(reqs: List[OCRRequest]) -> List[Tuple[str, str]]:
+    """Extrait le texte de plusieurs documents en une seule soumission au pool.
+
+    Pour les petits documents, le coût fixe (sérialisation vers le worker,
+    création de la boucle asyncio) dépasse celui de l'OCR lui-même : il est ici
+    payé une fois par chunk. Retourne un couple `(texte, erreur)` par requête,
+    dans l'ordre des requêtes.
+    """
+    async def extract_all() -> List[Tuple[str, str]]:
+        results = []
+        for req in reqs:
+            try:
+                results.append(((await extract_text(req)).text, ""))
+            except Exception as e:
+                results.append(("", str(e)))
+        return results
+
+    return asyncio.run(extract_all())
+
+
+def _is_small_document(path: Path) -> bool:
+    try:
+        return path.stat().st_size < SMALL_DOC_BYTES
+    except OSError:
+        return False # Laisse l'OCR individuel remonter l'erreur.
+
 
 # ------------------------------------------------------------------
 # Dataclasses
 # ------------------------------------------------------------------
-@dataclass
+@dataclass(slots=True)
 class Job:
     """Représente un job de traitement de SFD dans le batch."""
     path: Path # Chemin du fichier SFD.
@@ -61,6 +139,21 @@ class BatchProcessor:
         self.redis = redis.from_url(redis_url, decode_responses=False) # `decode_responses=False` pour stocker des bytes compressés.
         self.qwen3_pool = qwen3_pool
         self.limiter = asyncio.Semaphore(LLM_CONCURRENCY) # Limiteur de concurrence pour les appels LLM.
+        # Pool de processus pour l'OCR (CPU-bound) : contrairement à un pool de
+        # threads, il exploite réellement plusieurs cœurs malgré le GIL.
+        self.executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_warm_ocr_worker)
+        self._job_key = "" # Clé Redis (hash) du lot en cours, définie par `run`.
+        # (Dé)compresseurs persistants, partagés par toutes les sauvegardes de jobs.
+        self._cctx = zstd.ZstdCompressor(level=3, dict_data=_JOB_ZSTD_DICT)
+        self._dctx = zstd.ZstdDecompressor(dict_data=_JOB_ZSTD_DICT)
+
+    async def close(self) -> None:
+        """Arrête le pool de processus OCR.
+
+        L'attente de la sortie des workers se fait dans un thread, pour ne pas
+        bloquer la boucle d'événements.
+        """
+        await asyncio.to_thread(self.executor.shutdown, wait=True)
 
     # ------------------------------------------------------------------
     # API Publique
@@ -81,6 +174,7 @@ class BatchProcessor:
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         job_key = f"batch:{input_dir.name}"
+        self._job_key = job_key
 
         jobs = await self._load_or_create_jobs(job_key, input_dir, resume)
         BATCH_DOCS_TOTAL.set(len(jobs))
@@ -88,6 +182,8 @@ class BatchProcessor:
         # Exécute le pipeline OCR → LLM.
         await self._pipeline(jobs)
         await self._dump_results(output_dir, jobs)
+        # Une seule collecte complète par lot, une fois les résultats écrits.
+        gc.collect()
 
     # ------------------------------------------------------------------
     # Pipeline OCR puis LLM
@@ -95,17 +191,53 @@ class BatchProcessor:
     async def _pipeline(self, jobs: List[Job]) -> None:
         """Exécute le pipeline de traitement (OCR puis LLM) pour une liste de jobs."
 
+        Les deux étapes se chevauchent : chaque job part en analyse LLM dès que
+        son OCR est terminé, sans attendre la fin de l'OCR de tout le lot.
+
         Args:
             jobs: La liste des objets `Job` à traiter.
         """
-        # 1. Étape OCR (CPU-bound).
-        # `asyncio.gather` exécute les tâches en parallèle.
-        ocr_tasks = [self._ocr_one(job) for job in jobs if job.status == "pending"]
-        await asyncio.gather(*ocr_tasks)
-
-        # 2. Étape LLM (GPU-bound, limitée par le sémaphore).
-        llm_tasks = [self._llm_one(job) for job in jobs if job.ocr_text and job.status == "ocr_ok"]
-        await asyncio.gather(*llm_tasks)
+        ocr_done: asyncio.Queue[Optional[Job]] = asyncio.Queue(maxsize=LLM_CONCURRENCY * 2)
+        ocr_slots = asyncio.Semaphore(MAX_WORKERS) # Pas plus de tâches OCR que de workers.
+
+        async def ocr_and_forward(batch: List[Job]) -> None:
+            async with ocr_slots:
+                await self._ocr_batch(batch)
+            for job in batch:
+                if job.ocr_text and job.status == "ocr_ok":
+                    await ocr_done.put(job)
+
+        async def produce() -> None:
+            # 1. Étape OCR (CPU-bound) ; les jobs déjà OCRisés (reprise) passent directement.
+            for job in jobs:
+                if job.ocr_text and job.status == "ocr_ok":
+                    await ocr_done.put(job)
+            # Les gros documents restent unitaires pour répartir la charge entre workers.
+            batches: List[List[Job]] = []
+            small: List[Job] = []
+            for job in jobs:
+                if job.status != "pending":
+                    continue
+                if _is_small_document(job.path):
+                    small.append(job)
+                else:
+                    batches.append([job])
+            batches += [small[i:i + CHUNK_SIZE] for i in range(0, len(small), CHUNK_SIZE)]
+            async with asyncio.TaskGroup() as tg:
+                for batch in batches:
+                    tg.create_task(ocr_and_forward(batch))
+            await ocr_done.put(None) # Sentinelle : plus aucun job à analyser.
+
+        async def consume() -> None:
+            # 2. Étape LLM (GPU-bound, limitée par le sémaphore), lancée au fil de l'eau.
+            # `_llm_one` consigne ses erreurs dans le job : un échec n'annule pas les autres.
+            async with asyncio.TaskGroup() as tg:
+                while (job := await ocr_done.get()) is not None:
+                    tg.create_task(self._llm_one(job))
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(produce())
+            tg.create_task(consume())
 
     async def _ocr_one(self, job: Job) -> None:
         """Effectue l'extraction OCR pour un seul job."
@@ -115,13 +247,38 @@ class BatchProcessor:
         """
         try:
             req = OCRRequest(file_path=str(job.path), language="fra", preprocess=True)
-            # `asyncio.to_thread` est utilisé pour exécuter la fonction synchrone `extract_text`
-            # dans un thread séparé, évitant ainsi de bloquer l'event loop.
-            job.ocr_text = await asyncio.to_thread(extract_text, req)
+            # L'extraction s'exécute dans le pool de processus, sans bloquer l'event loop.
+            loop = asyncio.get_running_loop()
+            job.ocr_text = await loop.run_in_executor(self.executor, _ocr_in_worker, req)
             job.status = "ocr_ok"
         except Exception as e:
             job.status, job.error = "ocr_failed", str(e)
             logger.error(f"Échec de l'OCR pour {job.path.name}: {e}")
+        await self._save_job(self._job_key, job)
+
+    async def _ocr_batch(self, batch: List[Job]) -> None:
+        """Effectue l'extraction OCR d'un chunk de jobs en une seule soumission au pool."
+
+        Args:
+            batch: Les objets `Job` à traiter ; un chunk d'un seul job passe par `_ocr_one`.
+        """
+        if len(batch) == 1:
+            await self._ocr_one(batch[0])
+            return
+        reqs = [OCRRequest(file_path=str(job.path), language="fra", preprocess=True) for job in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _ocr_chunk_in_worker, reqs)
+        except Exception as e:
+            # Le worker lui-même a échoué (ex: processus tué) : tout le chunk est en échec.
+            results = [("", str(e))] * len(batch)
+        for job, (text, error) in zip(batch, results):
+            if error:
+                job.status, job.error = "ocr_failed", error
+                logger.error(f"Échec de l'OCR pour {job.path.name}: {error}")
+            else:
+                job.ocr_text, job.status = text, "ocr_ok"
+        await self._save_jobs(self._job_key, batch)
 
     async def _llm_one(self, job: Job) -> None:
         """Effectue l'analyse LLM pour un seul job."
@@ -139,6 +296,7 @@ class BatchProcessor:
             except Exception as e:
                 job.status, job.error = "llm_failed", str(e)
                 logger.error(f"Échec de l'analyse LLM pour {job.path.name}: {e}")
+        await self._save_job(self._job_key, job)
 
     # ------------------------------------------------------------------
     # Persistance Redis
@@ -156,28 +314,64 @@ class BatchProcessor:
         Returns:
             Une liste d'objets `Job`.
         """
-        if resume and await self.redis.exists(key):
-            raw = await self.redis.get(key)
-            # Décompresse et décode les jobs depuis Redis.
-            return [Job(**j) for j in json.loads(zstd.decompress(raw).decode('utf-8'))]
+        if resume:
+            # Un seul aller-retour : un hash absent est retourné vide par HGETALL.
+            raw = await self.redis.hgetall(key)
+            if raw:
+                # Décompresse et décode chaque job (un champ du hash par fichier).
+                return [self._decode_job(value) for value in raw.values()]
 
         # Crée de nouveaux jobs à partir des fichiers du répertoire d'entrée.
-        files = [p for p in input_dir.iterdir() if p.suffix.lower() in {".pdf", ".txt", ".docx"}]
-        jobs = [Job(p) for p in files]
-        await self._save_jobs(key, jobs)
+        with os.scandir(input_dir) as entries:
+            jobs = [
+                Job(Path(entry.path))
+                for entry in entries
+                if os.path.splitext(entry.name)[1].lower() in _ACCEPTED_SUFFIXES
+            ]
+        # Nouveau batch : les champs d'un run précédent ne doivent pas survivre
+        # dans le hash, sinon un `--resume` ultérieur les ferait revivre.
+        await self._save_jobs(key, jobs, replace=True)
         return jobs
 
-    async def _save_jobs(self, key: str, jobs: List[Job]) -> None:
-        """Sauvegarde l'état actuel des jobs dans Redis."
+    async def _save_jobs(self, key: str, jobs: List[Job], replace: bool = False) -> None:
+        """Sauvegarde l'état de tous les jobs dans Redis, en un seul aller-retour."
 
         Args:
-            key: La clé Redis pour stocker l'état du batch.
+            key: La clé Redis (hash) pour stocker l'état du batch.
             jobs: La liste des objets `Job` à sauvegarder.
+            replace: Si True, le hash est d'abord supprimé, dans la même transaction,
+                     pour ne contenir que `jobs`.
         """
-        # Compresse et encode les jobs en JSON avant de les stocker dans Redis avec un TTL.
-        await self.redis.set(
-            key, zstd.compress(json.dumps([asdict(j) for j in jobs], ensure_ascii=False).encode('utf-8')), ex=3600
-        )
+        async with self.redis.pipeline(transaction=replace) as pipe:
+            if replace:
+                pipe.delete(key)
+            for job in jobs:
+                pipe.hset(key, job.path.name, self._encode_job(job))
+            pipe.expire(key, JOB_STATE_TTL)
+            await pipe.execute()
+
+    async def _save_job(self, key: str, job: Job) -> None:
+        """Sauvegarde l'état d'un seul job : seul son champ du hash est réécrit."
+
+        Args:
+            key: La clé Redis (hash) pour stocker l'état du batch.
+            job: Le job dont l'état a changé.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, job.path.name, self._encode_job(job))
+            pipe.expire(key, JOB_STATE_TTL)
+            await pipe.execute()
+
+    def _encode_job(self, job: Job) -> bytes:
+        """Sérialise un job en JSON compressé (zstd avec dictionnaire)."""
+        return self._cctx.compress(orjson.dumps(asdict(job), default=str))
+
+    def _decode_job(self, raw: bytes) -> Job:
+        """Reconstruit un job à partir de sa forme sérialisée."""
+        data = orjson.loads(self._dctx.decompress(raw))
+        data["path"] = Path(data["path"])
+        data["status"] = sys.intern(data["status"]) # Quelques valeurs possibles : une seule chaîne partagée par statut.
+        return Job(**data)
 
     async def _dump_results(self, output_dir: Path, jobs: List[Job]) -> None:
         """Sauvegarde les résultats finaux des jobs dans le répertoire de sortie."
@@ -191,16 +385,18 @@ class BatchProcessor:
             "success": sum(1 for j in jobs if j.status == "done"),
             "failed": sum(1 for j in jobs if j.status.endswith("failed")),
         }
-        # Sauvegarde le résumé du traitement.
-        async with aiofiles.open(output_dir / "summary.json", "w", encoding='utf-8') as f:
-            await f.write(json.dumps(summary, indent=2, ensure_ascii=False))
-        
-        # Sauvegarde les résultats individuels des jobs réussis.
-        for job in jobs:
-            if job.result:
-                async with aiofiles.open(output_dir / f"{job.path.stem}.json", "w", encoding='utf-8') as f:
-                    await f.write(json.dumps(job.result, indent=2, ensure_ascii=False))
-        gc.collect() # Force le garbage collection pour libérer la mémoire.
+        write_slots = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+        async def write_json(path: Path, data: Any) -> None:
+            async with write_slots:
+                async with aiofiles.open(path, "wb") as f:
+                    await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str))
+
+        # Sauvegarde le résumé et les résultats individuels des jobs réussis, en parallèle.
+        await asyncio.gather(
+            write_json(output_dir / "summary.json", summary),
+            *(write_json(output_dir / f"{job.path.stem}.json", job.result) for job in jobs if job.result),
+        )
 
 # ------------------------------------------------------------------
 # Point d'entrée
@@ -220,9 +416,11 @@ async def main(
         resume: Reprendre le traitement.
         qwen3_pool: Pool de modèles Qwen3 (injecté).
     """
-    await BatchProcessor("redis://localhost:6379", qwen3_pool).run(
-        input_dir, output_dir, resume
-    )
+    processor = BatchProcessor("redis://localhost:6379", qwen3_pool)
+    try:
+        await processor.run(input_dir, output_dir, resume)
+    finally:
+        await processor.close()
 
 
 if __name__ == "__main__":
@@ -249,4 +447,11 @@ if __name__ == "__main__":
         (args.input_dir / "sfd_doc_2.txt").write_text("Contenu du document 2.")
         logger.info(f"Répertoire d'entrée factice créé : {args.input_dir}")
 
-    asyncio.run(main(**vars(args)))
+    async def run_cli() -> None:
+        await container.init_resources() # Ouvre les ressources asynchrones (client Redis).
+        try:
+            await main(**vars(args))
+        finally:
+            await container.shutdown_resources()
+
+    asyncio.run(run_cli())
@@ -1,20 +1,52 @@
 # src/cache/cache_manager.py
+import asyncio
 import hashlib
-import json
+import secrets
+import time
 from typing import Callable
 from typing import Optional, Any, Dict
 
+import orjson
+
+from src.cache.redis_lock import RELEASE_LOCK_LUA
+
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # pragma: no cover - optional dependency
+    _blake3 = None
+
+_KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+# Stored in place of a None result so known-empty keys are not recomputed.
+# The value carries its own deadline because GETEX refreshes the Redis TTL.
+_NONE_SENTINEL = b"__NONE__:"
+_MISS = object()
+
+
+class _ComputeAbandoned(Exception):
+    """Set on an in-flight future when its owner is cancelled; waiters retry"""
+
 
 class CacheManager:
     def __init__(self, redis_client):
         self.redis = redis_client
         self.default_ttl = 3600
+        self.negative_ttl = 60
+        # Single-flight: one compute per key in this process, guarded across
+        # processes by a short-lived Redis lock.
+        self.lock_ttl = 30
+        self.lock_poll_interval = 0.05
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Compare-and-delete: a lock is only released by the holder of its token.
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_LUA)
 
     @staticmethod
     def create_key(prefix: str, params: Dict[str, Any]) -> str:
         """Create a deterministic cache key"""
-        param_str = json.dumps(params, sort_keys=True)
-        hash_digest = hashlib.md5(param_str.encode()).hexdigest()
+        payload = orjson.dumps(params, option=_KEY_OPTIONS, default=str)
+        if _blake3 is not None:
+            hash_digest = _blake3(payload).hexdigest(16)
+        else:
+            hash_digest = hashlib.md5(payload).hexdigest()
         return f"{prefix}:{hash_digest}"
 
     async def get_or_compute(
@@ -24,14 +56,94 @@ class CacheManager:
             ttl: Optional[int] = None
     ) -> Any:
         """Get from cache or compute and store"""
-        cached = await self.redis.get(key)
+        # GETEX fetches and refreshes the TTL in one round-trip, so hot keys
+        # do not expire while they are still being read.
+        cached = await self.redis.getex(key, ex=ttl or self.default_ttl)
         if cached:
-            return json.loads(cached)
-
-        result = await compute_func()
-        await self.redis.setex(
-            key,
-            ttl or self.default_ttl,
-            json.dumps(result)
-        )
+            value = self._decode(cached)
+            if value is not _MISS:
+                return value
+
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except _ComputeAbandoned:
+                # The owner was cancelled, not us: the first waiter to resume
+                # takes over the computation, the others wait for it.
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._compute_once(key, compute_func, ttl)
+        except BaseException as exc:
+            # Never cancel the shared future: waiters would see a
+            # CancelledError although they were not cancelled themselves.
+            cancelled = isinstance(exc, asyncio.CancelledError)
+            future.set_exception(_ComputeAbandoned() if cancelled else exc)
+            future.exception()  # Mark as retrieved when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _compute_once(
+            self,
+            key: str,
+            compute_func: Callable,
+            ttl: Optional[int]
+    ) -> Any:
+        """Compute under the cross-process lock, or wait for its holder"""
+        lock_key = f"lock:{key}"
+        token = secrets.token_hex(16)
+        owns_lock = await self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        if not owns_lock:
+            cached = await self._wait_for_holder(key, lock_key)
+            if cached is not None:
+                value = self._decode(cached)
+                if value is not _MISS:
+                    return value
+            # The holder failed or its lock expired: compute ourselves.
+
+        try:
+            result = await compute_func()
+            if result is None:
+                deadline = int(time.time()) + self.negative_ttl
+                await self.redis.setex(key, self.negative_ttl, b"%s%d" % (_NONE_SENTINEL, deadline))
+            else:
+                await self.redis.setex(
+                    key,
+                    ttl or self.default_ttl,
+                    orjson.dumps(result, default=str)
+                )
+        finally:
+            if owns_lock:
+                # Our lock may have expired and been taken over during a long
+                # compute: never delete another holder's lock.
+                await self._release_lock(keys=[lock_key], args=[token])
         return result
+
+    async def _wait_for_holder(self, key: str, lock_key: str) -> Optional[bytes]:
+        """Poll until another process stores the value or releases its lock"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            cached = await self.redis.get(key)
+            if cached:
+                return cached
+            if not await self.redis.exists(lock_key):
+                break
+        return None
+
+    @staticmethod
+    def _decode(cached: Any) -> Any:
+        """Decode a stored value; expired negative entries decode to _MISS"""
+        if isinstance(cached, str):
+            cached = cached.encode()
+        if cached.startswith(_NONE_SENTINEL):
+            deadline = int(cached[len(_NONE_SENTINEL):])
+            return None if time.time() < deadline else _MISS
+        return orjson.loads(cached)
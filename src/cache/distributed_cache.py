@@ -1,30 +1,172 @@
 # src/cache/distributed_cache.py
-import redis
+import io
+import os
 import pickle
-import zlib
-from typing import Optional, Any
+import random
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import msgpack
+import redis.asyncio as redis
+import zstandard as zstd
+
+# Les valeurs plus petites sont stockées telles quelles : zstd n'y gagnerait rien.
+COMPRESS_THRESHOLD = 1024
+# Premier octet de chaque valeur stockée : indique si la suite est compressée.
+_RAW = b"\x00"
+_ZSTD = b"\x01"
+
+# Connexions Redis partagées par un cache ; hiredis, s'il est installé, est
+# utilisé automatiquement par redis-py pour analyser les réponses.
+MAX_CONNECTIONS = 64
+# Socket UNIX du serveur Redis local, préféré à TCP lorsqu'il existe.
+REDIS_UNIX_SOCKET = os.getenv("REDIS_UNIX_SOCKET", "/var/run/redis/redis.sock")
+_LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+_DEFAULT_REDIS_PORT = 6379
+# Jusqu'à +10 % de TTL aléatoire, pour que des entrées écrites ensemble
+# n'expirent pas toutes à la même seconde.
+TTL_JITTER = 0.1
+
+# Type d'extension msgpack portant un objet Python sérialisé par pickle, pour
+# les seules classes autorisées explicitement (voir `MsgpackSerializer`).
+_PICKLE_EXT = 1
+
+
+class _AllowListUnpickler(pickle.Unpickler):
+    """Unpickler qui ne résout que les classes de la liste blanche."""
+
+    def __init__(self, data: bytes, allowed: FrozenSet[Tuple[str, str]]):
+        super().__init__(io.BytesIO(data))
+        self._allowed = allowed
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in self._allowed:
+            raise pickle.UnpicklingError(f"Classe non autorisée dans le cache : {module}.{name}")
+        return super().find_class(module, name)
+
+
+def _prefer_unix_socket(redis_url: str) -> str:
+    """Réécrit une URL redis:// locale en unix:// si le socket du serveur existe.
+
+    Le socket UNIX évite la pile TCP/IP à chaque commande lorsque Redis tourne
+    sur la même machine. Seul le serveur local par défaut (port 6379 ou absent)
+    est concerné : une autre instance locale, sur un autre port, n'écoute pas
+    sur ce socket. Les autres URL (distantes, TLS) sont inchangées.
+    """
+    parts = urlsplit(redis_url)
+    if parts.scheme != "redis" or parts.hostname not in _LOCAL_HOSTS:
+        return redis_url
+    if parts.port not in (None, _DEFAULT_REDIS_PORT):
+        return redis_url
+    if not os.path.exists(REDIS_UNIX_SOCKET):
+        return redis_url
+    auth = parts.netloc.rpartition("@")[0]
+    db = parts.path.lstrip("/") or "0"
+    query = f"db={db}" + (f"&{parts.query}" if parts.query else "")
+    return f"unix://{auth + '@' if auth else ''}{REDIS_UNIX_SOCKET}?{query}"
+
+
+class MsgpackSerializer:
+    """Sérialiseur par défaut : msgpack, avec repli sur pickle sur liste blanche.
+
+    Les charges utiles de forme JSON (dict, list, str, nombres, bytes) sont
+    encodées en msgpack, plus compact et plus rapide que pickle. Le repli sur
+    pickle est désactivé par défaut : un objet non natif est refusé à
+    l'écriture, et une extension inconnue à la lecture, de sorte que des octets
+    écrits dans Redis par un tiers ne peuvent pas exécuter de code.
+
+    Args:
+        pickle_types: Classes autorisées à passer par pickle. À la lecture,
+            seules ces classes peuvent être reconstruites ; les classes
+            référencées par leur état doivent aussi y figurer.
+    """
+
+    def __init__(self, pickle_types: Iterable[type] = ()):
+        self._pickle_types = frozenset(pickle_types)
+        self._allowed = frozenset((t.__module__, t.__qualname__) for t in self._pickle_types)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True, default=self._default)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, ext_hook=self._ext_hook, strict_map_key=False)
+
+    def _default(self, obj: Any) -> msgpack.ExtType:
+        if type(obj) in self._pickle_types:
+            return msgpack.ExtType(_PICKLE_EXT, pickle.dumps(obj))
+        raise TypeError(f"Type non sérialisable dans le cache : {type(obj).__qualname__}")
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == _PICKLE_EXT and self._allowed:
+            return _AllowListUnpickler(data, self._allowed).load()
+        raise ValueError(f"Type d'extension msgpack non autorisé dans le cache : {code}")
+
 
 class DistributedCache:
-    def __init__(self, redis_url: str):
-        self.redis_client = redis.from_url(redis_url)
+    def __init__(self, redis_url: str, serializer: Any = None):
+        pool = redis.ConnectionPool.from_url(
+            _prefer_unix_socket(redis_url), max_connections=MAX_CONNECTIONS
+        )
+        self.redis_client = redis.Redis(connection_pool=pool)
         self.default_ttl = 3600  # 1 heure
         self.stats = {"hits": 0, "misses": 0}
+        self.serializer = serializer or MsgpackSerializer()
+        # (Dé)compresseurs réutilisés d'un appel à l'autre.
+        self._cctx = zstd.ZstdCompressor(level=3, threads=-1)
+        self._dctx = zstd.ZstdDecompressor()
 
     async def get(self, key: str) -> Optional[Any]:
         """Récupère une valeur du cache"""
         value = await self.redis_client.get(key)
         if value:
             self.stats["hits"] += 1
-            return pickle.loads(zlib.decompress(value))
+            return self.decode(value)
         self.stats["misses"] += 1
         return None
 
     async def set(self, key: str, value: Any, ttl: int = None):
         """Stocke une valeur dans le cache"""
+        await self.set_serialized(key, self.serializer.dumps(value), ttl)
+
+    async def set_serialized(self, key: str, blob: bytes, ttl: int = None):
+        """Stocke une valeur déjà sérialisée par `self.serializer`"""
         ttl = ttl or self.default_ttl
-        compressed_value = zlib.compress(pickle.dumps(value))
+        ttl = int(ttl * (1 + random.random() * TTL_JITTER))
         await self.redis_client.setex(
             key,
             ttl,
-            compressed_value
-        )
\ No newline at end of file
+            self._wrap(blob)
+        )
+
+    async def invalidate_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Supprime toutes les clés correspondant au motif glob Redis `pattern`
+
+        Les clés sont libérées par UNLINK (en arrière-plan côté Redis), par
+        lots de `batch_size` : un aller-retour par lot et non par clé, sans
+        accumuler toute la liste en mémoire.
+        """
+        deleted = 0
+        batch = []
+        async for key in self.redis_client.scan_iter(match=pattern, count=1000):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                deleted += await self.redis_client.unlink(*batch)
+                batch.clear()
+        if batch:
+            deleted += await self.redis_client.unlink(*batch)
+        return deleted
+
+    def decode(self, stored: bytes) -> Any:
+        """Reconstruit une valeur telle que lue brute dans Redis"""
+        return self.serializer.loads(self._unwrap(stored))
+
+    def _wrap(self, blob: bytes) -> bytes:
+        """Préfixe le marqueur de format, en compressant les blobs volumineux"""
+        if len(blob) > COMPRESS_THRESHOLD:
+            return _ZSTD + self._cctx.compress(blob)
+        return _RAW + blob
+
+    def _unwrap(self, stored: bytes) -> bytes:
+        if stored[:1] == _ZSTD:
+            return self._dctx.decompress(stored[1:])
+        return stored[1:]
@@ -1,30 +1,56 @@
 # src/cache/intelligent_cache.py
 import asyncio
-import pickle
+import hashlib
+import os
+import secrets
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Set
+from typing import Any, BinaryIO, Callable, Dict, Optional, Set, Tuple
 
-import aiofiles
 import numpy as np
 from sklearn.linear_model import SGDRegressor
 
 from src.cache.distributed_cache import DistributedCache
+from src.cache.redis_lock import RELEASE_LOCK_LUA
+
+# Verrou anti-stampede : un seul processus calcule une clé manquante.
+LOCK_TIMEOUT_MS = 30_000
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()  # Distingue une absence de L1 d'une valeur None en cache.
+
+
+# Format des fichiers L3 : longueur de la clé (4 octets), clé UTF-8, puis blob.
+def _make_l3_record(key: str, blob: bytes) -> bytes:
+    raw_key = key.encode()
+    return len(raw_key).to_bytes(4, "big") + raw_key + blob
+
+
+def _split_l3_record(data: bytes) -> Tuple[str, bytes]:
+    size = int.from_bytes(data[:4], "big")
+    return data[4:4 + size].decode(errors="replace"), data[4 + size:]
+
+
+def _read_l3_key(f: BinaryIO) -> str:
+    size = int.from_bytes(f.read(4), "big")
+    return f.read(size).decode(errors="replace")
 
 
 class TTLModel:
     def __init__(self) -> None:
         self.model = SGDRegressor(learning_rate="constant", eta0=0.01)
         self.is_fitted = False
+        # Ligne de caractéristiques réutilisée à chaque appel (aucune allocation).
+        self._buf = np.empty((1, 4), dtype=np.float64)
 
-    @staticmethod
-    def _features(meta: Dict[str, Any]) -> np.ndarray:
-        return np.array([
-            meta.get("size", 0),
-            meta.get("age", 0),
-            meta.get("hits", 0),
-            time.localtime().tm_hour,
-        ], dtype=float).reshape(1, -1)
+    def _features(self, meta: Dict[str, Any]) -> np.ndarray:
+        row = self._buf[0]
+        row[0] = meta.get("size", 0)
+        row[1] = meta.get("age", 0)
+        row[2] = meta.get("hits", 0)
+        row[3] = time.localtime().tm_hour
+        return self._buf
 
     def predict_ttl(self, meta: Dict[str, Any]) -> int:
         if not self.is_fitted:
@@ -54,14 +80,16 @@ class IntelligentCache:
             disk_cache_dir: Path = Path("./cache/l3"),
             max_ram_items: int = 1000,
     ) -> None:
-        self.l1: Dict[str, Any] = {}  # RAM
+        self.l1: OrderedDict[str, Any] = OrderedDict()  # RAM, ordre LRU
         self.l1_lock = asyncio.Lock()
         self.l2 = DistributedCache(redis_url)  # Redis
+        # Jusqu'à 256 sous-répertoires (2 premiers caractères hexa du nom), créés
+        # à la première écriture : le nombre de fichiers par répertoire reste borné.
         self.l3_dir = disk_cache_dir
-        self.l3_dir.mkdir(parents=True, exist_ok=True)
         self.max_ram_items = max_ram_items
         self.ttl_model = TTLModel()
         self.stats = {"l1_hit": 0, "l2_hit": 0, "l3_hit": 0, "miss": 0, "preload": 0}
+        self._release_lock = self.l2.redis_client.register_script(RELEASE_LOCK_LUA)
 
     # ------------------------------------------------------------------
     # Public API
@@ -78,11 +106,14 @@ class IntelligentCache:
         if preload:
             asyncio.create_task(self._preload_patterns([key]))
 
-        # L1
-        async with self.l1_lock:
-            if key in self.l1:
-                self.stats["l1_hit"] += 1
-                return self.l1[key]
+        # L1 : lecture sans verrou. Rien n'est attendu (await) entre la lecture
+        # et le retour, donc aucun écrivain ne peut s'intercaler ; seuls les
+        # écrivains prennent `l1_lock`.
+        val = self.l1.get(key, _MISSING)
+        if val is not _MISSING:
+            self.stats["l1_hit"] += 1
+            self.l1.move_to_end(key)
+            return val
 
         # L2
         val = await self.l2.get(key)
@@ -99,26 +130,41 @@ class IntelligentCache:
             await self._promote_to_l1(key, val)
             return val
 
-        # Compute + remplir tous les niveaux
+        # Compute + remplir tous les niveaux, sous verrou Redis consultatif :
+        # les autres appelants attendent la valeur au lieu de la recalculer.
         self.stats["miss"] += 1
-        val = await compute_fn()
-        await self._store_all_levels(key, val, ttl)
+        lock_key = f"{key}:lock"
+        token = secrets.token_hex(16)
+        locked = await self.l2.redis_client.set(lock_key, token, nx=True, px=LOCK_TIMEOUT_MS)
+        if not locked:
+            val = await self._wait_for_fill(key, lock_key)
+            if val is not None:
+                await self._promote_to_l1(key, val)
+                return val
+        try:
+            val = await compute_fn()
+            await self._store_all_levels(key, val, ttl)
+        finally:
+            if locked:
+                await self._release_lock(keys=[lock_key], args=[token])
         return val
 
     async def invalidate(self, pattern: str) -> None:
         """
         Invalidation globale : L1, L2 (Redis pattern), L3.
         """
-        async with self.l1_lock:
-            for k in list(self.l1.keys()):
-                if pattern in k:
-                    del self.l1[k]
+        # Sélection des victimes en une passe (test de sous-chaîne en C), puis
+        # suppression sous verrou ; les lectures L1 ne prennent pas le verrou.
+        victims = [k for k in self.l1 if pattern in k]
+        if victims:
+            async with self.l1_lock:
+                for k in victims:
+                    self.l1.pop(k, None)
 
-        await self.l2.invalidate_pattern(pattern)
+        await self.l2.invalidate_pattern(f"*{pattern}*")
 
-        # Suppression fichiers L3
-        for path in self.l3_dir.glob(f"*{pattern}*"):
-            path.unlink(missing_ok=True)
+        # Suppression fichiers L3 (les noms sont hachés : on lit la clé en en-tête)
+        await asyncio.to_thread(self._l3_invalidate, pattern)
 
     # ------------------------------------------------------------------
     # Pré-chargement
@@ -128,46 +174,108 @@ class IntelligentCache:
         """
         Charge en arrière-plan les clés les plus fréquentes dans L1.
         """
-        for k in keys:
-            if await self.l2.redis_client.exists(k):
-                val = await self.l2.get(k)
-                if val:
-                    await self._promote_to_l1(k, val)
-                    self.stats["preload"] += 1
+        keys = list(keys)
+        if not keys:
+            return
+        # Un seul MGET pour toutes les clés ; les absentes reviennent à None.
+        raws = await self.l2.redis_client.mget(keys)
+        found = [(k, self.l2.decode(raw)) for k, raw in zip(keys, raws) if raw]
+        async with self.l1_lock:
+            for k, val in found:
+                self._promote_locked(k, val)
+        self.stats["preload"] += len(found)
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    async def _wait_for_fill(self, key: str, lock_key: str) -> Any:
+        """Attend que le détenteur du verrou remplisse L2 ; None s'il abandonne."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LOCK_TIMEOUT_MS / 1000
+        while loop.time() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            val = await self.l2.get(key)
+            if val is not None:
+                return val
+            if not await self.l2.redis_client.exists(lock_key):
+                break
+        return None
+
     async def _promote_to_l1(self, key: str, value: Any) -> None:
         async with self.l1_lock:
-            if len(self.l1) >= self.max_ram_items:
-                # Simple LRU : pop first
-                self.l1.pop(next(iter(self.l1)))
-            self.l1[key] = value
+            self._promote_locked(key, value)
+
+    def _promote_locked(self, key: str, value: Any) -> None:
+        """Insère dans L1 ; l'appelant détient `l1_lock`."""
+        if key in self.l1:
+            self.l1.move_to_end(key)
+        elif len(self.l1) >= self.max_ram_items:
+            # LRU : évince l'entrée la moins récemment utilisée
+            self.l1.popitem(last=False)
+        self.l1[key] = value
 
     async def _store_all_levels(self, key: str, value: Any, ttl: Optional[int]) -> None:
-        meta = {"size": len(pickle.dumps(value)), "age": 0, "hits": 0}
+        # Sérialisation unique : le même blob sert à la taille, à L2 et à L3.
+        blob = self.l2.serializer.dumps(value)
+        meta = {"size": len(blob), "age": 0, "hits": 0}
         ttl = ttl or self.ttl_model.predict_ttl(meta)
 
-        # L1
-        await self._promote_to_l1(key, value)
-        # L2
-        await self.l2.set(key, value, ttl=ttl)
-        # L3
-        await self._l3_set(key, value)
+        # L1, L2 et L3 en parallèle : un miss coûte max(Redis, disque), pas la somme.
+        await asyncio.gather(
+            self._promote_to_l1(key, value),
+            self.l2.set_serialized(key, blob, ttl=ttl),
+            self._l3_set_bytes(key, blob),
+        )
+
+    def _l3_path(self, key: str) -> Path:
+        """Nom de fichier sûr et de longueur fixe, quelle que soit la clé."""
+        name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return self.l3_dir / name[:2] / f"{name[2:]}.bin"
 
     async def _l3_get(self, key: str) -> Any:
-        path = self.l3_dir / f"{key}.pkl"
-        if not path.exists():
+        path = self._l3_path(key)
+        # Lecture complète en un seul appel dans un thread : plus rapide que
+        # les allers-retours d'aiofiles pour des fichiers de cache de petite taille.
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+        stored_key, blob = _split_l3_record(data)
+        if stored_key != key:  # Collision de hachage : traitée comme un miss.
             return None
-        async with aiofiles.open(path, "rb") as f:
-            return pickle.loads(await f.read())
+        return self.l2.serializer.loads(blob)
 
-    async def _l3_set(self, key: str, value: Any) -> None:
-        path = self.l3_dir / f"{key}.pkl"
-        async with aiofiles.open(path, "wb") as f:
-            await f.write(pickle.dumps(value))
+    async def _l3_set_bytes(self, key: str, blob: bytes) -> None:
+        path = self._l3_path(key)
+        await asyncio.to_thread(self._l3_write, path, _make_l3_record(key, blob))
+
+    @staticmethod
+    def _l3_write(path: Path, record: bytes) -> None:
+        """Écrit un fichier L3 ; son sous-répertoire est créé s'il n'existe pas encore."""
+        try:
+            path.write_bytes(record)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(record)
+
+    def _l3_invalidate(self, pattern: str) -> None:
+        """Supprime les fichiers L3 dont la clé contient `pattern` (appel bloquant)."""
+        try:
+            shards = list(os.scandir(self.l3_dir))
+        except FileNotFoundError:  # Rien n'a encore été écrit sur disque.
+            return
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    with open(entry.path, "rb") as f:
+                        key = _read_l3_key(f)
+                except OSError:
+                    continue
+                if pattern in key:
+                    os.unlink(entry.path)
 
     # ------------------------------------------------------------------
     # Feedback loop (non bloquant)
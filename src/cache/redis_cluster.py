@@ -17,7 +17,8 @@ class RedisClusterClient:
         """
         self.cluster = redis.cluster.RedisCluster(
             startup_nodes=nodes,
-            skip_full_coverage_check=True # Peut être utile pour les environnements de développement.
+            skip_full_coverage_check=True, # Peut être utile pour les environnements de développement.
+            max_connections=32, # Taille du pool de connexions par nœud.
         )
 
     async def get(self, key: str):
@@ -0,0 +1,16 @@
+# src/cache/redis_lock.py
+"""Verrous Redis consultatifs partagés par les caches.
+
+Un verrou est posé par `SET key token NX PX|EX ttl` avec un jeton aléatoire
+propre à son détenteur ; il n'est libéré que par ce détenteur, grâce au script
+`RELEASE_LOCK_LUA` (comparaison puis suppression atomiques). Un calcul plus
+long que le TTL ne supprime donc pas le verrou repris entre-temps par un autre
+processus.
+"""
+
+RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
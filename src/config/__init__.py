@@ -0,0 +1,11 @@
+# src/config/__init__.py
+"""Initialise le package de configuration de l'application Altiora.
+
+Expose les paramètres applicatifs définis dans `settings.py` :
+- `Settings`: Le modèle de configuration globale.
+- `get_settings`: L'accès à l'instance unique des paramètres.
+- `ConfigLoadError`: L'erreur levée lorsqu'un fichier de configuration est illisible.
+"""
+from .settings import ConfigLoadError, Settings, get_settings
+
+__all__ = ['ConfigLoadError', 'Settings', 'get_settings']
@@ -1,21 +1,65 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional, Dict
+from types import MappingProxyType
+from typing import Any, Optional, Dict, Mapping, Tuple
+import logging
+import mmap
+import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Racine du projet, calculée une seule fois pour tous les chemins par défaut.
+_BASE_DIR = Path(__file__).resolve().parents[2]
+
+# Chargeur libyaml (C) si disponible, sinon le chargeur sûr en pur Python.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# En dessous de cette taille, une lecture simple coûte moins que la mise en
+# place d'un mmap ; au-delà, le fichier est projeté en mémoire.
+_MMAP_MIN_BYTES = 4096
+
+# Caches indexés par (chemin, mtime_ns, taille) : un fichier inchangé n'est ni
+# ré-analysé ni re-validé. Le YAML brut est mémorisé à part pour être réutilisé
+# par d'éventuelles sous-classes de `Settings`.
+_FileKey = Tuple[str, int, int]
+_yaml_cache: Dict[_FileKey, Dict[str, Any]] = {}
+_settings_cache: Dict[Tuple[type, _FileKey], "Settings"] = {}
+
+
+class ConfigLoadError(Exception):
+    """Le fichier de configuration n'a pas pu être lu ou analysé."""
+
+    def __init__(self, path: Path):
+        super().__init__(f"Impossible de charger la configuration depuis {path}")
+        self.path = path
+
+
+# Sous-sections en lecture seule : figées (aucune copie défensive ni
+# validation à l'affectation) et tolérantes aux clés inconnues.
+_SECTION_CONFIG = ConfigDict(frozen=True, extra="ignore", validate_assignment=False)
+
+# Défaut immuable, partagé tel quel par toutes les instances (renvoyé par une
+# fabrique : pydantic tenterait sinon d'en faire une copie profonde).
+_DEFAULT_OLLAMA_MODELS: Mapping[str, str] = MappingProxyType({
+    "qwen3": "qwen3-sfd-analyzer:latest",
+    "starcoder2": "starcoder2-playwright:latest"
+})
+
 class OllamaSettings(BaseModel):
     """Configuration Ollama"""
+    model_config = _SECTION_CONFIG
+
     host: str = "http://localhost:11434"
     timeout: int = 300
     max_retries: int = 3
-    models: Dict[str, str] = {
-        "qwen3": "qwen3-sfd-analyzer:latest",
-        "starcoder2": "starcoder2-playwright:latest"
-    }
+    models: Mapping[str, str] = Field(default_factory=lambda: _DEFAULT_OLLAMA_MODELS)
 
 class RedisSettings(BaseModel):
     """Configuration Redis"""
+    model_config = _SECTION_CONFIG
+
     url: str = "redis://localhost:6379"
     ttl: int = 3600
     max_connections: int = 50
@@ -23,11 +67,13 @@ class RedisSettings(BaseModel):
 
 class SecuritySettings(BaseModel):
     """Configuration de sécurité"""
+    model_config = _SECTION_CONFIG
+
     enable_auth: bool = False
     jwt_secret_key: Optional[str] = None
     jwt_algorithm: str = "HS256"
     jwt_expiration_minutes: int = 1440
-    allowed_origins: list[str] = ["*"]
+    allowed_origins: Tuple[str, ...] = ("*",)
     rate_limit_enabled: bool = True
     rate_limit_requests: int = 100
     rate_limit_window_seconds: int = 60
@@ -41,12 +87,12 @@ class Settings(BaseSettings):
     environment: str = "development"
 
     # Chemins
-    base_dir: Path = Path(__file__).parent.parent.parent
-    data_dir: Path = Field(default=Path(__file__).parent.parent.parent / "data")
-    models_dir: Path = Field(default=Path(__file__).parent.parent.parent / "models")
-    logs_dir: Path = Field(default=Path(__file__).parent.parent.parent / "logs")
-    reports_dir: Path = Field(default=Path(__file__).parent.parent.parent / "reports")
-    temp_dir: Path = Field(default=Path(__file__).parent.parent.parent / "temp")
+    base_dir: Path = _BASE_DIR
+    data_dir: Path = Field(default=_BASE_DIR / "data")
+    models_dir: Path = Field(default=_BASE_DIR / "models")
+    logs_dir: Path = Field(default=_BASE_DIR / "logs")
+    reports_dir: Path = Field(default=_BASE_DIR / "reports")
+    temp_dir: Path = Field(default=_BASE_DIR / "temp")
 
     # Services
     ollama: OllamaSettings = Field(default_factory=OllamaSettings)
@@ -62,23 +108,41 @@ class Settings(BaseSettings):
     def from_yaml(cls, path: Path):
         """Charger la configuration depuis un fichier YAML."""
         try:
-            with open(path, 'r') as f:
-                data = yaml.safe_load(f)
-            return cls(**data)
-        except (IOError, OSError, yaml.YAMLError) as e:
-            logger.info(f"Error loading configuration from {path}: {e}")
-            raise
-
-# Singleton pour les paramètres
-_settings_instance: Optional[Settings] = None
+            st = os.stat(path)
+            file_key = (os.fspath(path), st.st_mtime_ns, st.st_size)
+            cached = _settings_cache.get((cls, file_key))
+            if cached is not None:
+                return cached
+            data = _yaml_cache.get(file_key)
+            if data is None:
+                with open(path, 'rb') as f:
+                    if st.st_size < _MMAP_MIN_BYTES:
+                        data = yaml.load(f, Loader=_YamlLoader)
+                    else:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            data = yaml.load(mm, Loader=_YamlLoader)
+                _yaml_cache[file_key] = data
+            settings = _settings_cache[(cls, file_key)] = cls(**data)
+            return settings
+        except (OSError, yaml.YAMLError) as e:
+            logger.exception("Error loading configuration from %s", path)
+            raise ConfigLoadError(path) from e
 
+# Singleton pour les paramètres : lru_cache rend l'initialisation sûre entre
+# threads et supprime le test `is None` à chaque appel.
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    global _settings_instance
-    if _settings_instance is None:
-        # Tente de charger depuis config.yaml, sinon utilise les valeurs par défaut
-        config_path = Path(__file__).parent.parent.parent / "configs" / "config.yaml"
-        if config_path.exists():
-            _settings_instance = Settings.from_yaml(config_path)
-        else:
-            _settings_instance = Settings()
-    return _settings_instance
+    # Tente de charger depuis config.yaml, sinon utilise les valeurs par défaut.
+    # ALTIORA_CONFIG_MODE=env : configuration uniquement par l'environnement,
+    # le fichier n'est même pas recherché.
+    config_path = _BASE_DIR / "configs" / "config.yaml"
+    if os.environ.get("ALTIORA_CONFIG_MODE") != "env" and os.path.isfile(config_path):
+        return Settings.from_yaml(config_path)
+    return Settings()
+
+
+def invalidate_settings() -> None:
+    """Vide les caches de configuration (utile dans les tests)."""
+    get_settings.cache_clear()
+    _yaml_cache.clear()
+    _settings_cache.clear()
@@ -1,4 +1,4 @@
-# src/config.py
+# src/config_legacy.py
 """Module de configuration centralisé pour le projet Altiora (version simplifiée).
 
 Ce module définit la structure de configuration de base de l'application
@@ -9,26 +9,32 @@ ou les points d'accès API.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
-from configs.settings_loader import get_settings
+from src.config.settings import get_settings
 
 from src.infrastructure.redis_config import get_redis_client
 from src.models.sfd_models import SFDAnalysisRequest
 from src.orchestrator import Orchestrator
 
+__all__ = ["AltioraQAAssistant", "QAContext"]
+
 logger = logging.getLogger(__name__)
 
+# Horodatage inclus dans les identifiants de session.
+_SID_FMT = "%Y%m%d_%H%M%S"
+
 
 # ------------------------------------------------------------------
 # Contexte de session
 # ------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QAContext:
     """Représente le contexte d'une session d'interaction avec l'assistant.
 
@@ -97,11 +103,12 @@ class AltioraQAAssistant:
         Returns:
             Le contexte de la session nouvellement créée.
         """
+        now = datetime.now()
         self.context = QAContext(
             user_id=user_id,
             project_name=project_name,
-            session_id=f"{user_id}_{datetime.now():%Y%m%d_%H%M%S}",
-            created_at=datetime.now(),
+            session_id=f"{user_id}_{now.strftime(_SID_FMT)}",
+            created_at=now,
         )
         return self.context
 
@@ -125,7 +132,9 @@ class AltioraQAAssistant:
         """
         if self.orchestrator is None:
             raise RuntimeError("L'assistant n'est pas initialisé. Utilisez le gestionnaire de contexte `async with`.")
-        request = SFDAnalysisRequest(content=Path(sfd_path).read_text())
+        # Lecture dans un thread : un gros fichier ne bloque pas l'event loop.
+        content = await asyncio.to_thread(Path(sfd_path).read_bytes)
+        request = SFDAnalysisRequest(content=content.decode("utf-8"))
         return await self.orchestrator.process_sfd_to_tests(request)
 
     def get_session_summary(self) -> Dict[str, Any]:
@@ -8,7 +8,9 @@ possibilité d'utiliser un processeur de tâches personnalisé.
 
 import asyncio
 import logging
-from typing import Any, Awaitable, Callable
+from collections import deque
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,9 @@ class AsyncPipeline:
             *,
             max_concurrent: int = 4,
             processor: Callable[[Any], Awaitable[None]] | None = None,
+            batch_size: int = 16,
+            concurrent_batches: bool = False,
+            max_queue: int | None = None,
     ) -> None:
         """Initialise le pipeline asynchrone.
 
@@ -35,11 +40,36 @@ class AsyncPipeline:
                        qui sera appelée pour traiter chaque tâche soumise. Si non
                        fourni, un processeur par défaut qui loggue un avertissement
                        sera utilisé.
+            batch_size: Nombre maximal de tâches qu'un worker prélève d'un coup
+                        lorsque `concurrent_batches` est activé.
+            concurrent_batches: Si True, chaque worker traite ses tâches par lots,
+                                lancés en parallèle avec `asyncio.gather` : jusqu'à
+                                `max_concurrent * batch_size` tâches simultanées.
+                                À laisser désactivé si le processeur impose un ordre
+                                ou une limite stricte de concurrence.
+            max_queue: Nombre maximal de tâches en attente (par défaut
+                       `max_concurrent * 4`). Une fois la file pleine, `submit`
+                       attend qu'un worker libère une place ; `try_submit`
+                       refuse la tâche. Zéro ou une valeur négative : file non bornée.
         """
-        self.queue: asyncio.Queue[Any] = asyncio.Queue()
+        # File des tâches : un simple deque réveillé par un Event, moins coûteux
+        # qu'`asyncio.Queue` (aucun Future créé par put/get).
+        self._deque: deque[Any] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.max_queue = max_concurrent * 4 if max_queue is None else max_queue
+        # Plus grand nombre de tâches en attente observé depuis la création.
+        self.high_watermark = 0
+        # Suivi des tâches non terminées, pour `join()`.
+        self._unfinished = 0
+        self._all_done = asyncio.Event()
+        self._all_done.set()
         self.workers: list[asyncio.Task[None]] = []
         self.max_concurrent = max_concurrent
         self.processor = processor or self._default_processor
+        self.batch_size = max(1, batch_size)
+        self.concurrent_batches = concurrent_batches
 
     # ------------------------------------------------------------------
     # Cycle de vie du pipeline
@@ -72,15 +102,79 @@ class AsyncPipeline:
         """Soumet une tâche au pipeline pour traitement.
 
         La tâche est placée dans la queue et sera traitée par un worker disponible.
+        Si la queue est pleine, attend qu'une place se libère.
 
         Args:
             task: La tâche à traiter. Peut être de n'importe quel type.
         """
-        await self.queue.put(task)
+        await self._wait_for_room()
+        self._deque.append(task)
+        self._enqueued(1)
+
+    def try_submit(self, task: Any) -> bool:
+        """Soumet une tâche sans attendre.
+
+        Returns:
+            True si la tâche a été mise en queue, False si la queue est pleine
+            (la tâche est alors abandonnée).
+        """
+        if not self._has_room():
+            return False
+        self._deque.append(task)
+        self._enqueued(1)
+        return True
+
+    async def submit_many(self, tasks: Iterable[Any]) -> None:
+        """Soumet plusieurs tâches au pipeline en une seule opération.
+
+        Les tâches sont ajoutées par blocs aussi grands que la place libre le
+        permet, et les workers ne sont réveillés qu'une fois par bloc ; si la
+        queue est pleine, attend qu'une place se libère. Elles sont prélevées
+        dans l'ordre de l'itérable, à la suite des tâches déjà en attente ; avec
+        plusieurs workers, leur ordre de fin n'est pas garanti.
+
+        Args:
+            tasks: Les tâches à traiter.
+        """
+        tasks = iter(tasks)
+        while True:
+            await self._wait_for_room()
+            room = self.max_queue - len(self._deque) if self.max_queue > 0 else None
+            before = len(self._deque)
+            self._deque.extend(islice(tasks, room))
+            added = len(self._deque) - before
+            if not added:
+                return
+            self._enqueued(added)
+
+    def qsize(self) -> int:
+        """Retourne le nombre de tâches en attente de traitement."""
+        return len(self._deque)
+
+    async def join(self) -> None:
+        """Attend que toutes les tâches soumises aient été traitées."""
+        await self._all_done.wait()
 
     # ------------------------------------------------------------------
     # Fonctions internes
     # ------------------------------------------------------------------
+    def _has_room(self) -> bool:
+        return self.max_queue <= 0 or len(self._deque) < self.max_queue
+
+    async def _wait_for_room(self) -> None:
+        """Bloque le producteur tant que la queue est pleine (contre-pression)."""
+        while not self._has_room():
+            self._not_full.clear()
+            await self._not_full.wait()
+
+    def _enqueued(self, count: int) -> None:
+        """Comptabilise `count` tâches ajoutées et réveille les workers."""
+        self._unfinished += count
+        self._all_done.clear()
+        if len(self._deque) > self.high_watermark:
+            self.high_watermark = len(self._deque)
+        self._not_empty.set()
+
     async def _worker(self, name: str) -> None:
         """Boucle principale d'un worker de pipeline.
 
@@ -93,16 +187,56 @@ class AsyncPipeline:
         """
         while True:
             try:
-                task = await self.queue.get()
+                if not self._deque:
+                    self._not_empty.clear()
+                    await self._not_empty.wait()
+                    continue
+                if self.concurrent_batches:
+                    await self._process_batch(name)
+                    continue
+                task = self._deque.popleft()
+                self._not_full.set()
                 await self.processor(task)
-                self.queue.task_done()
+                self._task_done()
             except asyncio.CancelledError:
                 # Le worker a été annulé, il doit s'arrêter.
                 break
             except Exception as e:
                 # Loggue l'exception mais continue de traiter les autres tâches.
-                logger.exception("Le worker %s n'a pas pu traiter la tâche : %s", name, e)
-                self.queue.task_done()
+                self._log_failure(name, e)
+                self._task_done()
+
+    async def _process_batch(self, name: str) -> None:
+        """Prélève jusqu'à `batch_size` tâches et les traite en parallèle.
+
+        Un seul réveil du worker et un seul `await` amortissent le coût
+        d'ordonnancement sur tout le lot ; l'échec d'une tâche n'interrompt pas
+        les autres.
+        """
+        count = min(self.batch_size, len(self._deque))
+        batch = [self._deque.popleft() for _ in range(count)]
+        self._not_full.set()
+        results = await asyncio.gather(
+            *(self.processor(task) for task in batch), return_exceptions=True
+        )
+        for task, result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self._log_failure(name, result)
+            self._task_done()
+
+    @staticmethod
+    def _log_failure(name: str, exc: BaseException) -> None:
+        """Loggue l'échec d'une tâche ; la trace complète n'est formatée qu'en DEBUG."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.error("Le worker %s n'a pas pu traiter la tâche : %s", name, exc, exc_info=exc)
+        else:
+            logger.error("Le worker %s n'a pas pu traiter la tâche : %r", name, exc)
+
+    def _task_done(self) -> None:
+        """Marque une tâche comme terminée et réveille `join()` si plus rien n'est en cours."""
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._all_done.set()
 
     # ------------------------------------------------------------------
     # Processeur par défaut (peut être surchargé)
@@ -139,11 +273,10 @@ if __name__ == "__main__":
         await pipeline.start()
 
         print("Soumission des tâches...")
-        for i in range(10):
-            await pipeline.submit(i)
+        await pipeline.submit_many(range(10))
 
         # Attend que toutes les tâches soumises soient traitées.
-        await pipeline.queue.join()
+        await pipeline.join()
         print("Toutes les tâches soumises ont été traitées.")
 
         await pipeline.stop()
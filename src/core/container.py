@@ -8,6 +8,8 @@ facile dans d'autres parties du code, favorisant ainsi le découplage
 et la testabilité.
 """
 
+from typing import AsyncIterator, Optional
+
 import redis.asyncio as redis
 from dependency_injector import containers, providers
 from dependency_injector.wiring import Provide
@@ -19,6 +21,35 @@ from configs.config_module import get_settings
 from src.orchestrator import Orchestrator
 
 
+async def _redis_resource(
+        url: str, password: Optional[str], max_connections: int
+) -> AsyncIterator[redis.Redis]:
+    """Cycle de vie du client Redis partagé.
+
+    La connexion est ouverte et vérifiée (`PING`) dès `init_resources()`, au
+    démarrage, plutôt qu'à la première commande ; le pool est fermé par
+    `shutdown_resources()`. Le pool est borné à `max_connections` ; le parseur
+    C hiredis est utilisé automatiquement par redis-py lorsqu'il est installé.
+    """
+    client = redis.from_url(
+        url,
+        password=password,
+        max_connections=max_connections,
+        health_check_interval=30,
+        decode_responses=True,
+    )
+    await client.ping()
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def _model_config(settings, name: str):
+    """Extrait la configuration d'un modèle LLM des paramètres globaux."""
+    return settings.models[name]
+
+
 class Container(containers.DeclarativeContainer):
     """Conteneur de dépendances pour l'application Altiora."
 
@@ -36,29 +67,35 @@ class Container(containers.DeclarativeContainer):
         max_memory_gb=config.provided.model_memory_limit_gb
     )
 
-    # Client Redis asynchrone, configuré avec l'URL de Redis des paramètres.
-    redis_client = providers.Singleton(
-        redis.from_url,
+    # Client Redis asynchrone, géré comme une ressource : initialisé par
+    # `await container.init_resources()` et fermé par `await container.shutdown_resources()`.
+    # Les réponses sont décodées automatiquement en UTF-8.
+    redis_client = providers.Resource(
+        _redis_resource,
         url=config.provided.redis.url,
-        password=config.provided.redis.password, # Ajout du mot de passe Redis.
-        decode_responses=True # Décode automatiquement les réponses en UTF-8.
+        password=config.provided.redis.password,
+        max_connections=config.provided.redis.max_connections,
     )
 
-    # Service Qwen3, créé comme une fabrique (nouvelle instance à chaque injection).
+    # Configurations des modèles, extraites une seule fois de `config.models`
+    # puis réutilisées à chaque création de service.
+    qwen3_model_config = providers.Singleton(_model_config, settings=config, name="qwen3")
+    starcoder_model_config = providers.Singleton(_model_config, settings=config, name="starcoder2")
+
+    # Service Qwen3, créé comme un singleton : sa session HTTP (et son pool de
+    # connexions) ainsi que son disjoncteur sont partagés par tous les appelants.
     # Il est configuré avec les paramètres spécifiques à Qwen3 et le gestionnaire de mémoire.
-    qwen3_service = providers.Factory(
+    qwen3_service = providers.Singleton(
         Qwen3OllamaInterface,
-        # Assurez-vous que `config.provided.models["qwen3"]` est un objet ModelConfig.
-        config=config.provided.models["qwen3"],
+        config=qwen3_model_config,
         model_memory_manager=model_memory_manager
     )
 
-    # Service StarCoder2, créé comme une fabrique.
+    # Service StarCoder2, créé comme un singleton pour les mêmes raisons.
     # Il est configuré avec les paramètres spécifiques à StarCoder2 et le gestionnaire de mémoire.
-    starcoder_service = providers.Factory(
+    starcoder_service = providers.Singleton(
         StarCoder2OllamaInterface,
-        # Assurez-vous que `config.provided.models["starcoder2"]` est un objet ModelConfig.
-        config=config.provided.models["starcoder2"],
+        config=starcoder_model_config,
         model_memory_manager=model_memory_manager
     )
 
@@ -77,15 +114,17 @@ class Container(containers.DeclarativeContainer):
 # Démonstration (exemple d'utilisation)
 # ------------------------------------------------------------------
 if __name__ == "__main__":
+    import asyncio
     import logging
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from typing import Any, Dict, List
+
+    from pydantic import BaseModel, Field
 
-    # Crée une instance du conteneur.
-    container = Container()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
     # Pour la démonstration, nous devons simuler une configuration minimale.
     # En temps normal, la configuration serait chargée via `config.from_yaml` ou des variables d'environnement.
-    # Ici, nous allons mocker `get_settings` pour fournir une configuration factice.
+    # Ici, le provider `config` est surchargé par une configuration factice.
     class MockOllamaModelConfig(BaseModel):
         name: str = "mock-model"
         temperature: float = 0.7
@@ -112,31 +151,34 @@ if __name__ == "__main__":
             "starcoder2": MockOllamaModelConfig(name="starcoder2-playwright")
         }
 
-    # Patch la fonction get_settings pour qu'elle retourne notre configuration factice.
-    with patch('configs.config_module.get_settings', return_value=MockSettings()):
-        # Réinitialise le conteneur pour qu'il utilise la nouvelle configuration.
+    async def demo():
         container = Container()
-        container.wire(modules=[__name__]) # Re-câble les dépendances.
-
-        print("\n--- Récupération des dépendances via le conteneur ---")
-        # Récupère l'orchestrateur (qui est un singleton).
-        orchestrator_instance = container.orchestrator()
-        print(f"Instance Orchestrator : {orchestrator_instance}")
-
-        # Récupère le service Qwen3 (qui est une nouvelle instance à chaque injection).
-        qwen3_service_instance_1 = container.qwen3_service()
-        print(f"Instance Qwen3 Service 1 : {qwen3_service_instance_1}")
-
-        qwen3_service_instance_2 = container.qwen3_service()
-        print(f"Instance Qwen3 Service 2 : {qwen3_service_instance_2}")
-
-        assert orchestrator_instance is container.orchestrator(), "L'orchestrateur devrait être un singleton."
-        assert qwen3_service_instance_1 is not qwen3_service_instance_2, "Le service Qwen3 devrait être une nouvelle instance à chaque fois."
-
-        print("Démonstration du conteneur de dépendances terminée.")
-
-        # Nettoyage des ressources (fermeture des clients Redis, etc.).
-        # En production, cela serait géré par le lifespan de l'application FastAPI.
-        # await container.redis_client().close()
-        # await qwen3_service_instance_1.close()
-        # await starcoder_service_instance_1.close()
+        container.config.override(providers.Object(MockSettings()))
+        container.wire(modules=[__name__]) # Câble les dépendances.
+
+        # Ouvre les ressources asynchrones (client Redis) avant toute résolution.
+        await container.init_resources()
+        try:
+            print("\n--- Récupération des dépendances via le conteneur ---")
+            # L'orchestrateur dépend d'une ressource asynchrone (Redis) : le provider
+            # retourne un awaitable, qui résout toujours la même instance (singleton).
+            orchestrator_instance = await container.orchestrator()
+            print(f"Instance Orchestrator : {orchestrator_instance}")
+
+            # Récupère le service Qwen3 (la même instance à chaque injection).
+            qwen3_service_instance_1 = container.qwen3_service()
+            print(f"Instance Qwen3 Service 1 : {qwen3_service_instance_1}")
+
+            qwen3_service_instance_2 = container.qwen3_service()
+            print(f"Instance Qwen3 Service 2 : {qwen3_service_instance_2}")
+
+            assert orchestrator_instance is await container.orchestrator(), "L'orchestrateur devrait être un singleton."
+            assert qwen3_service_instance_1 is qwen3_service_instance_2, "Le service Qwen3 devrait être un singleton."
+
+            print("Démonstration du conteneur de dépendances terminée.")
+        finally:
+            # Ferme les ressources (client Redis). En production, cela est géré
+            # par le lifespan de l'application FastAPI.
+            await container.shutdown_resources()
+
+    asyncio.run(demo())
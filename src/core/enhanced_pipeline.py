@@ -8,69 +8,238 @@ et la concurrence dans les workflows complexes.
 """
 
 import asyncio
+import inspect
 import logging
-from typing import AsyncIterator, TypeVar, Callable, List
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, TypeVar, Callable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T') # Type générique pour les éléments transitant dans le pipeline.
 
+# Fin de flux, distincte de toute valeur qu'une étape peut produire (y compris None).
+_END = object()
+
+
+@dataclass(slots=True)
+class _Err:
+    """Échec du traitement d'un élément, transmis à la place de son résultat."""
+    exc: BaseException
+
+
+class _FastChannel:
+    """File bornée entre deux étapes : un `deque` et deux `asyncio.Event`.
+
+    Même rôle qu'`asyncio.Queue` pour `put`/`get`/`get_nowait`, sans Future
+    créé par opération ni comptage `task_done` : le chemin sans attente se
+    réduit à un `append`/`popleft` et au positionnement d'un événement.
+    """
+
+    __slots__ = ("_items", "maxsize", "_not_empty", "_not_full")
+
+    def __init__(self, maxsize: int = 0):
+        self._items: deque = deque()
+        self.maxsize = maxsize
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    async def put(self, item) -> None:
+        """Ajoute `item`, en attendant une place si la file est pleine."""
+        while 0 < self.maxsize <= len(self._items):
+            self._not_full.clear()
+            await self._not_full.wait()
+        self._items.append(item)
+        self._not_empty.set()
+
+    async def get(self):
+        """Retire et retourne le premier élément, en attendant s'il n'y en a aucun."""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._pop()
+
+    def get_nowait(self):
+        """Retire le premier élément ; lève `asyncio.QueueEmpty` si la file est vide."""
+        if not self._items:
+            raise asyncio.QueueEmpty
+        return self._pop()
+
+    def _pop(self):
+        item = self._items.popleft()
+        self._not_full.set()
+        return item
+
+
+def _fuse(funcs: List[Callable]) -> Callable:
+    """Compose des étapes synchrones : `_fuse([f1, f2])(x) == f2(f1(x))`."""
+    def fused(item):
+        for func in funcs:
+            item = func(item)
+        return item
+    fused.__name__ = "+".join(getattr(f, "__name__", "stage") for f in funcs)
+    return fused
+
 
 class AsyncPipeline:
     """Construit et exécute un pipeline de traitement asynchrone avec des étapes chaînées."""
 
-    def __init__(self, max_buffer_size: int = 100):
+    def __init__(
+            self,
+            max_buffer_size: int = 16,
+            batch_size: int = 32,
+            per_stage_buffer: Optional[List[int]] = None,
+            stage_concurrency: Optional[List[int]] = None,
+            raise_on_error: bool = False,
+    ):
         """Initialise le pipeline asynchrone.
 
         Args:
             max_buffer_size: La taille maximale des files d'attente (queues) entre les étapes.
                              Cela contrôle la quantité de données qui peuvent être mises en tampon
                              entre les étapes, affectant la consommation de mémoire et le débit.
+            batch_size: Nombre maximal d'éléments qu'un worker prélève d'un coup dans sa
+                        file d'entrée. Les résultats du lot sont transmis à l'étape suivante
+                        en une seule insertion.
+            per_stage_buffer: Taille de la file d'entrée de chaque étape, dans l'ordre
+                              d'ajout (l'élément `len(stages)` éventuel dimensionne la
+                              file de sortie). Les files non précisées utilisent
+                              `max_buffer_size`.
+            stage_concurrency: Nombre de workers de chaque étape, dans l'ordre d'ajout
+                               (1 par défaut). Les workers d'une même étape se partagent
+                               sa file d'entrée ; l'ordre des résultats n'est alors plus
+                               garanti.
+            raise_on_error: Si True, `process` relève la première exception levée
+                            par une étape et arrête le pipeline. Sinon (par défaut),
+                            l'élément en échec est journalisé puis écarté, et les
+                            autres éléments continuent.
         """
         self.max_buffer_size = max_buffer_size
+        self.batch_size = max(1, batch_size)
+        self.per_stage_buffer = per_stage_buffer or []
+        self.stage_concurrency = stage_concurrency or []
+        self.raise_on_error = raise_on_error
         self.stages: List[Callable] = []
+        self._sync_stages: List[bool] = [] # Étapes déclarées synchrones, fusionnables.
 
-    def add_stage(self, func: Callable) -> 'AsyncPipeline':
+    def add_stage(self, func: Callable, sync: bool = False) -> 'AsyncPipeline':
         """Ajoute une étape (fonction asynchrone) au pipeline.
 
         Chaque étape est une fonction qui prend un élément en entrée et retourne
-        un élément (ou un itérable d'éléments) en sortie.
+        un élément (ou un itérable d'éléments) en sortie. Les étapes consécutives
+        ajoutées avec `sync=True` sont fusionnées en un seul appel, sans file
+        d'attente entre elles.
 
         Args:
             func: La fonction asynchrone à ajouter comme étape du pipeline.
+            sync: True si `func` est une fonction ordinaire qui retourne directement
+                  son résultat (jamais un awaitable ni un itérateur asynchrone).
 
         Returns:
             L'instance du pipeline pour permettre le chaînage des appels.
         """
         self.stages.append(func)
+        self._sync_stages.append(sync)
         return self
 
-    async def _stage_worker(self, stage_func: Callable, input_queue: asyncio.Queue, output_queue: asyncio.Queue):
+    async def _stage_worker(self, stage_func: Callable, input_queue: _FastChannel, output_queue: _FastChannel):
         """Worker pour une étape individuelle du pipeline.
 
-        Consomme les éléments de `input_queue`, les traite avec `stage_func`,
-        et place les résultats dans `output_queue`.
+        Les files transportent des lots (listes d'éléments). Après une attente,
+        le worker vide sans suspension les lots déjà disponibles, jusqu'à
+        `batch_size` éléments, les traite avec `stage_func` et place tous les
+        résultats dans `output_queue` en un seul lot.
         """
         while True:
-            item = await input_queue.get()
-            if item is None: # Signal de fin.
-                await output_queue.put(None)
-                input_queue.task_done()
+            batch = await input_queue.get()
+            if batch is _END: # Signal de fin.
+                # Remis dans la file pour les autres workers de l'étape ; la fin est
+                # signalée en aval par `_run_stage` une fois tous arrêtés.
+                await input_queue.put(_END)
+                break
+            items = list(batch)
+            ended = False
+            while len(items) < self.batch_size:
+                try:
+                    batch = input_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if batch is _END:
+                    ended = True
+                    break
+                items.extend(batch)
+
+            results = []
+            for item in items:
+                if isinstance(item, _Err):
+                    # Échec d'une étape précédente : transmis tel quel.
+                    results.append(item)
+                    continue
+                try:
+                    result = stage_func(item)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    if isinstance(result, AsyncIterator):
+                        async for res_item in result:
+                            results.append(res_item)
+                    else:
+                        results.append(result)
+                except Exception as e:
+                    logger.error(f"Erreur dans l'étape du pipeline : {e}", exc_info=True)
+                    # L'échec reste attaché à son élément ; le flux continue.
+                    results.append(_Err(e))
+            if results:
+                await output_queue.put(results)
+            if ended:
+                await input_queue.put(_END)
                 break
-            try:
-                result = await stage_func(item)
-                if isinstance(result, AsyncIterator):
-                    async for res_item in result:
-                        await output_queue.put(res_item)
-                else:
-                    await output_queue.put(result)
-            except Exception as e:
-                logger.error(f"Erreur dans l'étape du pipeline : {e}", exc_info=True)
-                # Gérer l'erreur : propager, ignorer, etc.
-                # Pour l'instant, on propage le None pour signaler un problème.
-                await output_queue.put(None)
-            finally:
-                input_queue.task_done()
+
+    async def _run_stage(self, stage_func: Callable, concurrency: int,
+                         input_queue: _FastChannel, output_queue: _FastChannel):
+        """Exécute `concurrency` workers sur la même file d'entrée, puis signale la fin."""
+        await asyncio.gather(*(
+            self._stage_worker(stage_func, input_queue, output_queue)
+            for _ in range(max(1, concurrency))
+        ))
+        await output_queue.put(_END)
+
+    @staticmethod
+    async def _feed(items: AsyncIterator[T], queue: _FastChannel):
+        """Place les éléments d'entrée dans la première file, un lot par élément.
+
+        Le premier worker regroupe lui-même ceux qui sont déjà disponibles.
+        """
+        async for item in items:
+            await queue.put([item])
+        # Signale la fin de l'entrée à la première queue.
+        await queue.put(_END)
+
+    @staticmethod
+    def _per_stage(values: List[int], index: int, default: int) -> int:
+        return values[index] if index < len(values) else default
+
+    def _compile_stages(self) -> List[Tuple[Callable, int, int]]:
+        """Regroupe les étapes consécutives déclarées `sync=True` en une seule étape.
+
+        Returns:
+            Pour chaque étape effective : sa fonction, son nombre de workers et la
+            taille de sa file d'entrée. Une étape fusionnée reprend la file de sa
+            première étape et le plus grand nombre de workers du groupe.
+        """
+        compiled = []
+        i = 0
+        while i < len(self.stages):
+            j = i + 1
+            if self._sync_stages[i]:
+                while j < len(self.stages) and self._sync_stages[j]:
+                    j += 1
+            funcs = self.stages[i:j]
+            concurrency = max(self._per_stage(self.stage_concurrency, k, 1) for k in range(i, j))
+            buffer = self._per_stage(self.per_stage_buffer, i, self.max_buffer_size)
+            compiled.append((_fuse(funcs) if len(funcs) > 1 else funcs[0], concurrency, buffer))
+            i = j
+        return compiled
 
     async def process(self, items: AsyncIterator[T]) -> AsyncIterator[T]:
         """Traite un flux d'éléments à travers le pipeline.
@@ -81,34 +250,46 @@ class AsyncPipeline:
         Yields:
             Les éléments traités par le pipeline.
         """
-        # Crée une file d'attente pour chaque étape + une pour l'entrée et une pour la sortie.
-        queues = [asyncio.Queue(maxsize=self.max_buffer_size)
-                  for _ in range(len(self.stages) + 1)]
+        stages = self._compile_stages()
+        # Crée une file d'entrée pour chaque étape effective, plus une pour la sortie.
+        queues = [_FastChannel(maxsize=buffer) for _, _, buffer in stages]
+        queues.append(_FastChannel(
+            maxsize=self._per_stage(self.per_stage_buffer, len(self.stages), self.max_buffer_size)
+        ))
 
         # Crée et démarre les workers pour chaque étape du pipeline.
         workers = []
-        for i, stage in enumerate(self.stages):
-            worker = asyncio.create_task(
-                self._stage_worker(stage, queues[i], queues[i + 1])
-            )
+        for i, (stage, concurrency, _) in enumerate(stages):
+            worker = asyncio.create_task(self._run_stage(
+                stage, concurrency, queues[i], queues[i + 1]
+            ))
             workers.append(worker)
 
-        # Alimente la première queue avec les éléments d'entrée.
-        async for item in items:
-            await queues[0].put(item)
-
-        # Signale la fin de l'entrée à la première queue.
-        await queues[0].put(None)
+        # Alimente la première queue dans une tâche séparée : avec des files bornées,
+        # l'entrée doit progresser pendant que la sortie est consommée.
+        workers.append(asyncio.create_task(self._feed(items, queues[0])))
 
-        # Récupère les résultats de la dernière queue.
-        while True:
-            result = await queues[-1].get()
-            if result is None: # Signal de fin de traitement.
-                break
-            yield result
+        try:
+            # Récupère les résultats de la dernière queue.
+            while True:
+                batch = await queues[-1].get()
+                if batch is _END: # Signal de fin de traitement.
+                    break
+                for result in batch:
+                    if isinstance(result, _Err):
+                        # Déjà journalisé par l'étape en échec.
+                        if self.raise_on_error:
+                            raise result.exc
+                        continue
+                    yield result
 
-        # Attend que tous les workers aient terminé leur traitement.
-        await asyncio.gather(*workers)
+            # Attend que tous les workers aient terminé leur traitement.
+            await asyncio.gather(*workers)
+        finally:
+            # Arrêt anticipé (erreur, consommateur qui abandonne) : libère les workers.
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
 
 # ------------------------------------------------------------------
@@ -6,6 +6,8 @@ En cas d'échec de la stratégie principale, le système tente automatiquement
 d'exécuter l'opération avec des stratégies de fallback, selon un ordre de priorité.
 """
 
+from bisect import insort
+from itertools import count
 from typing import Any, List, Tuple
 import logging
 
@@ -18,10 +20,13 @@ class FallbackSystem:
     def __init__(self):
         """Initialise le système de fallback.
 
-        Les stratégies sont stockées sous forme de tuples (priorité, stratégie).
-        Une priorité plus basse signifie une exécution plus précoce.
+        Les stratégies sont stockées, triées, sous forme de tuples
+        (priorité, rang d'ajout, stratégie). Une priorité plus basse signifie une
+        exécution plus précoce ; à priorité égale, l'ordre d'ajout est conservé
+        sans jamais comparer les stratégies entre elles.
         """
-        self.strategies: List[Tuple[int, Any]] = []
+        self.strategies: List[Tuple[int, int, Any]] = []
+        self._counter = count()
 
     def add_strategy(self, strategy: Any, priority: int = 0):
         """Ajoute une stratégie de fallback au système.
@@ -31,9 +36,8 @@ class FallbackSystem:
             priority: La priorité de la stratégie. Les stratégies avec une priorité plus basse
                       seront tentées en premier. Par défaut à 0.
         """
-        self.strategies.append((priority, strategy))
-        # Trie les stratégies par priorité pour s'assurer de l'ordre d'exécution.
-        self.strategies.sort(key=lambda x: x[0])
+        # Insertion à sa place (O(log n) pour la recherche) plutôt qu'un tri complet.
+        insort(self.strategies, (priority, next(self._counter), strategy))
         logger.info(f"Stratégie ajoutée : {strategy.__class__.__name__} avec priorité {priority}")
 
     async def execute_with_fallback(self, operation: str, *args: Any, **kwargs: Any) -> Any:
@@ -52,7 +56,7 @@ class FallbackSystem:
         """
         errors: List[Tuple[str, str]] = []
 
-        for priority, strategy in self.strategies:
+        for priority, _, strategy in self.strategies:
             strategy_name = strategy.__class__.__name__
             logger.info(f"Tentative d'exécution de l'opération '{operation}' avec la stratégie : {strategy_name} (Priorité: {priority})")
             try:
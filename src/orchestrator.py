@@ -10,7 +10,7 @@ import tenacity
 import yaml
 from torch.backends.opt_einsum import strategy
 
-from configs.settings_loader import get_settings
+from src.config.settings import get_settings
 from src.core.strategies.strategy_registry import StrategyRegistry
 from src.models.qwen3.qwen3_interface import Qwen3OllamaInterface
 from src.models.sfd_models import SFDAnalysisRequest
@@ -0,0 +1,45 @@
+# tests/test_auth_database.py
+"""Tests unitaires de la mise à niveau du schéma (`src.auth.database.upgrade_schema`).
+
+Une base créée avant l'introduction de `locked_until_ts` ne possède que la
+colonne `locked_until` (DateTime) : la mise à niveau doit ajouter la nouvelle
+colonne, y recopier les verrouillages actifs et rester idempotente.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.auth.database import upgrade_schema
+
+_LEGACY_USERS = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    locked_until DATETIME
+)
+"""
+
+
+@pytest.mark.asyncio
+async def test_upgrade_adds_column_and_keeps_active_locks():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    active = datetime.utcnow() + timedelta(minutes=10)
+    expired = datetime.utcnow() - timedelta(minutes=10)
+    async with engine.begin() as conn:
+        await conn.execute(text(_LEGACY_USERS))
+        await conn.execute(
+            text("INSERT INTO users (id, username, locked_until) VALUES (1, 'a', :t), (2, 'b', :e), (3, 'c', NULL)"),
+            {"t": active, "e": expired},
+        )
+        await conn.run_sync(upgrade_schema)
+        await conn.run_sync(upgrade_schema)  # Un second démarrage ne change rien.
+        rows = dict((await conn.execute(text("SELECT id, locked_until_ts FROM users"))).all())
+    await engine.dispose()
+
+    assert abs(rows[1] - (time.time() + 600)) < 5
+    assert rows[2] is None
+    assert rows[3] is None
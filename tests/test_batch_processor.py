@@ -0,0 +1,118 @@
+# tests/test_batch_processor.py
+"""Tests unitaires de la persistance Redis des jobs du `BatchProcessor`.
+
+L'état d'un lot est stocké dans un hash Redis (un champ par fichier). Ces tests
+vérifient qu'un nouveau lot remplace entièrement l'état précédent et qu'une
+reprise (`resume=True`) restitue les jobs sauvegardés.
+"""
+
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from src.batch_processor import BatchProcessor, Job
+
+JOB_KEY = "altiora:batch:test"
+
+
+class _FakePipeline:
+    """Pipeline Redis minimal : les commandes sont appliquées à `execute()`."""
+
+    def __init__(self, store: dict):
+        self._store = store
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def delete(self, key):
+        self._ops.append(lambda: self._store.pop(key, None))
+
+    def hset(self, key, field, value):
+        self._ops.append(lambda: self._store.setdefault(key, {}).__setitem__(field, value))
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        for op in self._ops:
+            op()
+        self._ops.clear()
+
+
+class _FakeRedis:
+    """Client Redis en mémoire limité aux hashes utilisés par le processeur."""
+
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self.store)
+
+    async def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+
+@pytest_asyncio.fixture
+async def processor():
+    """Fixture fournissant un `BatchProcessor` branché sur un Redis en mémoire."""
+    proc = BatchProcessor("redis://localhost:6379/0", qwen3_pool=None)
+    proc.redis = _FakeRedis()
+    yield proc
+    await proc.close()
+
+
+def _touch(directory: Path, *names: str) -> None:
+    for name in names:
+        (directory / name).write_text("contenu SFD")
+
+
+@pytest.mark.asyncio
+async def test_fresh_run_replaces_previous_batch(processor: BatchProcessor, tmp_path: Path):
+    """Un lot lancé sans reprise ne doit conserver aucun champ d'un lot précédent."""
+    stale = Job(tmp_path / "ancien.pdf", status="done")
+    await processor._save_jobs(JOB_KEY, [stale])
+    _touch(tmp_path, "a.pdf", "b.txt", "ignore.png")
+
+    jobs = await processor._load_or_create_jobs(JOB_KEY, tmp_path, resume=False)
+
+    assert sorted(job.path.name for job in jobs) == ["a.pdf", "b.txt"]
+    assert sorted(processor.redis.store[JOB_KEY]) == ["a.pdf", "b.txt"]
+
+    # Une reprise ultérieure ne doit pas faire revivre l'ancien job.
+    resumed = await processor._load_or_create_jobs(JOB_KEY, tmp_path, resume=True)
+    assert sorted(job.path.name for job in resumed) == ["a.pdf", "b.txt"]
+
+
+@pytest.mark.asyncio
+async def test_resume_restores_saved_jobs(processor: BatchProcessor, tmp_path: Path):
+    """Une reprise restitue les jobs sauvegardés avec leur état, sans relire le répertoire."""
+    saved = [
+        Job(tmp_path / "a.pdf", ocr_text="texte", status="done", result={"ok": True}),
+        Job(tmp_path / "b.pdf", status="ocr_failed", error="illisible"),
+    ]
+    await processor._save_jobs(JOB_KEY, saved)
+    _touch(tmp_path, "nouveau.pdf")
+
+    jobs = await processor._load_or_create_jobs(JOB_KEY, tmp_path, resume=True)
+
+    by_name = {job.path.name: job for job in jobs}
+    assert sorted(by_name) == ["a.pdf", "b.pdf"]
+    assert by_name["a.pdf"].status == "done"
+    assert by_name["a.pdf"].result == {"ok": True}
+    assert by_name["b.pdf"].error == "illisible"
+
+
+@pytest.mark.asyncio
+async def test_resume_without_saved_state_scans_input(processor: BatchProcessor, tmp_path: Path):
+    """Sans état sauvegardé, une reprise crée les jobs à partir du répertoire d'entrée."""
+    _touch(tmp_path, "a.docx")
+
+    jobs = await processor._load_or_create_jobs(JOB_KEY, tmp_path, resume=True)
+
+    assert [job.path.name for job in jobs] == ["a.docx"]
+    assert [job.status for job in jobs] == ["pending"]
@@ -0,0 +1,87 @@
+# tests/test_cache_manager.py
+"""Tests unitaires du single-flight de `CacheManager.get_or_compute`.
+
+Un client Redis en mémoire remplace Redis : seules les commandes utilisées
+par le gestionnaire sont implémentées.
+"""
+
+import asyncio
+
+import pytest
+
+from src.cache.cache_manager import CacheManager
+
+
+class _FakeRedis:
+    """Client Redis en mémoire (sans expiration) pour `CacheManager`."""
+
+    def __init__(self):
+        self.store = {}
+
+    def register_script(self, script):
+        async def release(keys, args):
+            if self.store.get(keys[0]) == args[0]:
+                del self.store[keys[0]]
+        return release
+
+    async def getex(self, key, ex=None):
+        return self.store.get(key)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def exists(self, key):
+        return key in self.store
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_computation():
+    manager = CacheManager(_FakeRedis())
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"valeur": 42}
+
+    results = await asyncio.gather(*(manager.get_or_compute("k", compute) for _ in range(5)))
+
+    assert calls == 1
+    assert results == [{"valeur": 42}] * 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_hands_over_to_a_waiter():
+    """L'annulation du calculateur n'annule pas les appelants qui l'attendaient."""
+    manager = CacheManager(_FakeRedis())
+    started = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.01 if calls > 1 else 10)
+        return "ok"
+
+    owner = asyncio.create_task(manager.get_or_compute("k", compute))
+    await started.wait()
+    waiters = [asyncio.create_task(manager.get_or_compute("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    assert await asyncio.gather(*waiters) == ["ok"] * 3
+    assert calls == 2
@@ -0,0 +1,47 @@
+# tests/test_distributed_cache.py
+"""Tests unitaires du sérialiseur du cache distribué (`MsgpackSerializer`).
+
+Des octets lus dans Redis ne doivent jamais pouvoir reconstruire une classe
+arbitraire : le repli sur pickle est désactivé par défaut et, lorsqu'il est
+activé, limité à une liste blanche.
+"""
+
+import os
+import pickle
+from dataclasses import dataclass
+
+import msgpack
+import pytest
+
+from src.cache.distributed_cache import _PICKLE_EXT, MsgpackSerializer
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+# Charge utile qu'un attaquant pourrait écrire dans Redis.
+_MALICIOUS = msgpack.packb(msgpack.ExtType(_PICKLE_EXT, pickle.dumps(os.system)))
+
+
+def test_native_values_round_trip():
+    serializer = MsgpackSerializer()
+    value = {"texte": "é", "nombres": [1, 2.5], "brut": b"\x00\x01", 3: None}
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+def test_pickle_fallback_is_off_by_default():
+    serializer = MsgpackSerializer()
+    with pytest.raises(TypeError):
+        serializer.dumps(Point(1, 2))
+    with pytest.raises(ValueError):
+        serializer.loads(_MALICIOUS)
+
+
+def test_allow_listed_types_round_trip_and_others_are_rejected():
+    serializer = MsgpackSerializer(pickle_types=[Point])
+    assert serializer.loads(serializer.dumps({"p": Point(1, 2)})) == {"p": Point(1, 2)}
+    with pytest.raises(pickle.UnpicklingError):
+        serializer.loads(_MALICIOUS)
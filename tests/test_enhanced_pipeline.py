@@ -0,0 +1,111 @@
+# tests/test_enhanced_pipeline.py
+"""Tests unitaires du pipeline à étapes (`src.core.enhanced_pipeline.AsyncPipeline`).
+
+Ces tests couvrent la fusion des étapes déclarées synchrones au milieu
+d'étapes asynchrones, le traitement des callables qui retournent des
+awaitables, et la propagation des échecs sans interruption du flux.
+"""
+
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+from src.core.enhanced_pipeline import AsyncPipeline
+
+
+async def _numbers(count: int) -> AsyncIterator[int]:
+    for i in range(count):
+        yield i
+
+
+async def _collect(pipeline: AsyncPipeline, count: int) -> List:
+    return [item async for item in pipeline.process(_numbers(count))]
+
+
+async def _double(x: int) -> int:
+    await asyncio.sleep(0)
+    return x * 2
+
+
+async def _passthrough(x):
+    await asyncio.sleep(0)
+    return x
+
+
+def _add_one(x: int) -> int:
+    return x + 1
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+@pytest.mark.asyncio
+async def test_mixed_sync_and_async_stages():
+    """Les étapes `sync=True` consécutives sont fusionnées ; le résultat est inchangé."""
+    pipeline = (
+        AsyncPipeline(batch_size=4)
+        .add_stage(_add_one, sync=True)
+        .add_stage(_square, sync=True)
+        .add_stage(_double)
+        .add_stage(_add_one, sync=True)
+    )
+
+    compiled = pipeline._compile_stages()
+    assert len(compiled) == 3, "Les deux premières étapes synchrones devraient être fusionnées."
+
+    results = await _collect(pipeline, 50)
+    assert results == [((i + 1) ** 2) * 2 + 1 for i in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_callables_returning_awaitables_are_not_fused():
+    """Sans `sync=True`, un lambda qui retourne une coroutine reste une étape attendue."""
+    pipeline = (
+        AsyncPipeline()
+        .add_stage(lambda x: _double(x))
+        .add_stage(lambda x: x + 10)
+    )
+
+    assert len(pipeline._compile_stages()) == 2
+    assert await _collect(pipeline, 5) == [10, 12, 14, 16, 18]
+
+
+@pytest.mark.asyncio
+async def test_async_generator_stage_filters_items():
+    """Une étape générateur asynchrone peut émettre zéro ou plusieurs éléments."""
+    async def keep_even(x: int) -> AsyncIterator[int]:
+        if x % 2 == 0:
+            yield x
+
+    pipeline = AsyncPipeline().add_stage(_add_one, sync=True).add_stage(keep_even)
+
+    assert await _collect(pipeline, 10) == [2, 4, 6, 8, 10]
+
+
+@pytest.mark.asyncio
+async def test_failing_item_does_not_stop_the_stream():
+    """Un élément en échec est écarté, les suivants (y compris `None`) continuent."""
+    def fragile(x: int):
+        if x == 3:
+            raise ValueError("élément invalide")
+        return None if x == 5 else x
+
+    pipeline = AsyncPipeline().add_stage(fragile, sync=True).add_stage(_passthrough)
+
+    assert await _collect(pipeline, 8) == [0, 1, 2, 4, None, 6, 7]
+
+
+@pytest.mark.asyncio
+async def test_raise_on_error_propagates_first_failure():
+    """Avec `raise_on_error=True`, la première exception d'une étape est relevée."""
+    def fragile(x: int) -> int:
+        if x == 3:
+            raise ValueError("élément invalide")
+        return x
+
+    pipeline = AsyncPipeline(raise_on_error=True).add_stage(fragile, sync=True).add_stage(_double)
+
+    with pytest.raises(ValueError):
+        await _collect(pipeline, 100)
@@ -0,0 +1,52 @@
+# tests/test_hs256.py
+"""Tests unitaires du chemin rapide HS256 (`src.auth._hs256`).
+
+Le chemin rapide doit accepter et rejeter exactement les mêmes jetons que
+`jwt.decode`, avec les mêmes exceptions PyJWT.
+"""
+
+import time
+
+import jwt
+import pytest
+
+from src.auth._hs256 import decode_hs256, encode_hs256
+
+KEY = b"cle-de-test"
+NOW = int(time.time())
+
+
+def _outcome(decode, token: str):
+    try:
+        return decode(token)
+    except jwt.InvalidTokenError as exc:
+        return type(exc)
+
+
+@pytest.mark.parametrize("payload", [
+    {"sub": "alice", "exp": NOW + 600},
+    {"sub": "alice", "exp": NOW - 1},
+    {"sub": "alice", "nbf": NOW + 600, "exp": NOW + 1200},
+    {"sub": "alice", "iat": NOW + 600},
+    {"sub": "alice", "nbf": NOW - 5, "iat": NOW - 5, "exp": NOW + 5},
+    {"sub": "alice", "iat": "hier"},
+    {"sub": "alice", "nbf": "demain"},
+    {"sub": "alice", "aud": "autre-service"},
+    {"sub": 42},
+])
+def test_fast_path_matches_pyjwt(payload):
+    token = encode_hs256(payload, KEY)
+    expected = _outcome(lambda t: jwt.decode(t, KEY, algorithms=["HS256"]), token)
+    assert _outcome(lambda t: decode_hs256(t, KEY), token) == expected
+
+
+def test_not_yet_valid_token_is_rejected():
+    token = encode_hs256({"sub": "alice", "nbf": NOW + 600}, KEY)
+    with pytest.raises(jwt.ImmatureSignatureError):
+        decode_hs256(token, KEY)
+
+
+def test_tampered_signature_is_rejected():
+    token = encode_hs256({"sub": "alice", "exp": NOW + 600}, KEY)
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_hs256(token, b"autre-cle")
@@ -0,0 +1,47 @@
+# tests/test_password_utils.py
+"""Tests unitaires de la politique de mot de passe (`is_password_strong`).
+
+Vérifie chaque critère de la politique, y compris pour les lettres et
+chiffres non ASCII, classés comme par les prédicats `str` (`isupper`,
+`islower`, `isdigit`).
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from src.auth.models import UserCreate, WeakPasswordError
+from src.auth.password_utils import is_password_strong
+
+
+@pytest.mark.parametrize("password", [
+    "Password1!",
+    "PASSWORDé1!",   # `é` compte comme minuscule.
+    "motdepassÉ1!",  # `É` compte comme majuscule.
+    "Passwörd٣!x",   # Chiffre arabo-indien.
+])
+def test_strong_passwords_are_accepted(password: str):
+    ok, _ = is_password_strong(password)
+    assert ok, f"{password!r} devrait être accepté."
+
+
+@pytest.mark.parametrize("password, expected", [
+    ("Pa1!", "au moins 8 caractères"),
+    ("password1!", "majuscule"),
+    ("PASSWORD1!", "minuscule"),
+    ("Passwordé!", "chiffre"),
+    ("Password12", "caractère spécial"),
+])
+def test_weak_passwords_report_the_missing_class(password: str, expected: str):
+    ok, message = is_password_strong(password)
+    assert not ok
+    assert expected in message
+
+
+def test_user_create_reports_weak_password_as_dedicated_error():
+    """`UserCreate` signale un mot de passe faible par `WeakPasswordError` (HTTP 400 côté service)."""
+    with pytest.raises(ValidationError) as exc_info:
+        UserCreate(username="alice", email="alice@example.com", password="password1!")
+
+    (error,) = exc_info.value.errors()
+    assert isinstance(error["ctx"]["error"], WeakPasswordError)
+    assert "majuscule" in str(error["ctx"]["error"])
@@ -0,0 +1,142 @@
+# tests/test_user_service.py
+"""Tests unitaires de `UserService` : verrouillage de compte et cache des profils.
+
+Le verrouillage est stocké sous forme de timestamp Unix (`locked_until_ts`) et
+posé par un UPDATE évalué côté base après 5 échecs consécutifs. Les profils
+mis en cache entre requêtes sont des `UserProfile` immuables. Ces tests
+utilisent une base SQLite en mémoire (aiosqlite).
+"""
+
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth import user_service as user_service_module
+from src.auth.models import Base, User, UserResponse
+from src.auth.user_service import LOCKOUT_SECONDS, UserProfile, UserService
+
+PASSWORD = "Password1!"
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Fixture fournissant une session sur une base SQLite en mémoire, tables créées."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    user_service_module._user_cache.clear()
+    async with session_factory() as session:
+        session.info["factory"] = session_factory
+        yield session
+    user_service_module._user_cache.clear()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def service(db_session) -> UserService:
+    svc = UserService(db_session)
+    await svc.create_user(username="alice", email="alice@example.com", password=PASSWORD)
+    return svc
+
+
+async def _row(db_session, username: str = "alice") -> User:
+    result = await db_session.execute(
+        select(User).where(User.username == username).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_created_user_has_timestamps(service: UserService, db_session):
+    """`created_at` est renseigné à la création (requis par `UserResponse`)."""
+    user = await _row(db_session)
+    assert user.created_at is not None
+    assert user.locked_until_ts is None
+
+
+@pytest.mark.asyncio
+async def test_four_failures_do_not_lock(service: UserService, db_session):
+    for _ in range(4):
+        assert await service.authenticate_user("alice", "Mauvais1!") is None
+
+    user = await _row(db_session)
+    assert user.failed_login_attempts == 4
+    assert user.locked_until_ts is None
+    assert not UserService.is_user_locked(user)
+
+
+@pytest.mark.asyncio
+async def test_fifth_failure_locks_account(service: UserService, db_session):
+    """Le 5e échec pose un verrou qui expire `LOCKOUT_SECONDS` plus tard."""
+    before = int(time.time())
+    for _ in range(5):
+        assert await service.authenticate_user("alice", "Mauvais1!") is None
+    after = int(time.time())
+
+    user = await _row(db_session)
+    assert user.failed_login_attempts == 5
+    assert before + LOCKOUT_SECONDS <= user.locked_until_ts <= after + LOCKOUT_SECONDS
+    assert UserService.is_user_locked(user)
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_is_not_active(service: UserService, db_session):
+    user = await _row(db_session)
+    user.locked_until_ts = int(time.time()) - 1
+    await db_session.commit()
+
+    assert not UserService.is_user_locked(await _row(db_session))
+
+
+@pytest.mark.asyncio
+async def test_successful_login_resets_failures(service: UserService, db_session):
+    for _ in range(2):
+        await service.authenticate_user("alice", "Mauvais1!")
+
+    user = await service.authenticate_user("alice", PASSWORD)
+    assert user is not None
+    assert user.failed_login_attempts == 0
+    assert user.last_login is not None
+
+    stored = await _row(db_session)
+    assert stored.failed_login_attempts == 0
+    assert stored.last_login is not None
+
+
+@pytest.mark.asyncio
+async def test_profile_cache_is_shared_as_an_immutable_snapshot(service: UserService, db_session):
+    """Une autre session (autre requête) reçoit le même instantané, sans instance ORM."""
+    profile = await service.get_user_by_username("alice")
+    assert isinstance(profile, UserProfile)
+    assert UserResponse.model_validate(profile, from_attributes=True).username == "alice"
+
+    async with db_session.info["factory"]() as other_session:
+        assert await UserService(other_session).get_user_by_username("alice") is profile
+
+
+@pytest.mark.asyncio
+async def test_deactivation_invalidates_cached_profile(service: UserService, db_session):
+    profile = await service.get_user_by_username("alice")
+    assert profile.is_active
+
+    assert await service.deactivate_user(profile.id)
+
+    async with db_session.info["factory"]() as other_session:
+        refreshed = await UserService(other_session).get_user_by_username("alice")
+    assert refreshed is not profile
+    assert not refreshed.is_active
+
+
+@pytest.mark.asyncio
+async def test_failed_login_marks_cached_profile_stale(service: UserService):
+    """Un échec de connexion invalide l'instantané conservé par le cache des jetons."""
+    profile = await service.get_user_by_username("alice")
+    assert UserService.is_profile_current(profile)
+
+    await service.authenticate_user("alice", "Mauvais1!")
+
+    assert not UserService.is_profile_current(profile)